@@ -94,7 +94,7 @@ class PatchEngine:
         log.info("Running preflight checks...")
         
         # Security analysis
-        self.security = SecurityAnalyzer(bytes(self.data))
+        self.security = SecurityAnalyzer(self.data)  # Read-only scan, no copy needed
         status = self.security.analyze()
         
         self.stats.boot_guard = status.boot_guard_enabled
@@ -147,79 +147,81 @@ class PatchEngine:
         
         log.info(f"Applying preset: {config.preset}")
         
-        # Unlock
-        if config.cfg_lock == 0:
-            self.patcher.unlock_all()
-        
-        # Power limits
-        if config.pl1 is not None:
-            if config.pl1 > 95:
-                log.warning(f"[WARN] PL1 {config.pl1}W exceeds Dell G5 5090 VRM spec (95W)")
-            self.patcher.set_power_limit('Pl1', config.pl1)
-            self.patcher.patch_setup_offset('Pl1En', 1)
-        
-        if config.pl2 is not None:
-            if config.pl2 > 115:
-                log.warning(f"[WARN] PL2 {config.pl2}W exceeds Dell G5 5090 VRM spec (115W)")
-            self.patcher.set_power_limit('Pl2', config.pl2)
-            self.patcher.patch_setup_offset('Pl2En', 1)
-        
-        if config.pl3 is not None:
-            self.patcher.set_power_limit('Pl3', config.pl3)
-        
-        if config.pl4 is not None:
-            self.patcher.set_power_limit('Pl4', config.pl4)
-        
-        if config.tau is not None:
-            self.patcher.patch_setup_offset('Tau', config.tau)
-        
-        # Voltage offsets
-        if config.vcore_offset is not None:
-            self.patcher.set_voltage_offset('Vc', config.vcore_offset)
-        
-        if config.ring_offset is not None:
-            self.patcher.set_voltage_offset('Rg', config.ring_offset)
-        
-        if config.sa_offset is not None:
-            self.patcher.set_voltage_offset('Sa', config.sa_offset)
-        
-        if config.io_offset is not None:
-            self.patcher.set_voltage_offset('Io', config.io_offset)
-        
-        # Turbo ratios
-        if config.turbo_1c is not None:
-            self.patcher.patch_setup_offset('R1', config.turbo_1c)
-        if config.turbo_2c is not None:
-            self.patcher.patch_setup_offset('R2', config.turbo_2c)
-        if config.turbo_3c is not None:
-            self.patcher.patch_setup_offset('R3', config.turbo_3c)
-        if config.turbo_4c is not None:
-            self.patcher.patch_setup_offset('R4', config.turbo_4c)
-        if config.turbo_5c is not None:
-            self.patcher.patch_setup_offset('R5', config.turbo_5c)
-        if config.turbo_6c is not None:
-            self.patcher.patch_setup_offset('R6', config.turbo_6c)
-        
-        # C-States
-        if config.c_states is not None:
-            self.patcher.patch_setup_offset('CSt', config.c_states)
-        if config.c1e is not None:
-            self.patcher.patch_setup_offset('C1E', config.c1e)
-        if config.pkg_c_state is not None:
-            self.patcher.patch_setup_offset('PkgC', config.pkg_c_state)
-        
-        # PCIe
-        if config.above_4g is not None:
-            self.patcher.patch_setup_offset('A4G', config.above_4g)
-        if config.resizable_bar is not None:
-            self.patcher.patch_setup_offset('RBar', config.resizable_bar)
+        # Setup patches are write-combined into one patch per adjacent run
+        with self.patcher.batch():
+            # Unlock
+            if config.cfg_lock == 0:
+                self.patcher.unlock_all()
+            
+            # Power limits
+            if config.pl1 is not None:
+                if config.pl1 > 95:
+                    log.warning(f"[WARN] PL1 {config.pl1}W exceeds Dell G5 5090 VRM spec (95W)")
+                self.patcher.set_power_limit('Pl1', config.pl1)
+                self.patcher.patch_setup_offset('Pl1En', 1)
+            
+            if config.pl2 is not None:
+                if config.pl2 > 115:
+                    log.warning(f"[WARN] PL2 {config.pl2}W exceeds Dell G5 5090 VRM spec (115W)")
+                self.patcher.set_power_limit('Pl2', config.pl2)
+                self.patcher.patch_setup_offset('Pl2En', 1)
+            
+            if config.pl3 is not None:
+                self.patcher.set_power_limit('Pl3', config.pl3)
+            
+            if config.pl4 is not None:
+                self.patcher.set_power_limit('Pl4', config.pl4)
+            
+            if config.tau is not None:
+                self.patcher.patch_setup_offset('Tau', config.tau)
+            
+            # Voltage offsets
+            if config.vcore_offset is not None:
+                self.patcher.set_voltage_offset('Vc', config.vcore_offset)
+            
+            if config.ring_offset is not None:
+                self.patcher.set_voltage_offset('Rg', config.ring_offset)
+            
+            if config.sa_offset is not None:
+                self.patcher.set_voltage_offset('Sa', config.sa_offset)
+            
+            if config.io_offset is not None:
+                self.patcher.set_voltage_offset('Io', config.io_offset)
+            
+            # Turbo ratios
+            if config.turbo_1c is not None:
+                self.patcher.patch_setup_offset('R1', config.turbo_1c)
+            if config.turbo_2c is not None:
+                self.patcher.patch_setup_offset('R2', config.turbo_2c)
+            if config.turbo_3c is not None:
+                self.patcher.patch_setup_offset('R3', config.turbo_3c)
+            if config.turbo_4c is not None:
+                self.patcher.patch_setup_offset('R4', config.turbo_4c)
+            if config.turbo_5c is not None:
+                self.patcher.patch_setup_offset('R5', config.turbo_5c)
+            if config.turbo_6c is not None:
+                self.patcher.patch_setup_offset('R6', config.turbo_6c)
+            
+            # C-States
+            if config.c_states is not None:
+                self.patcher.patch_setup_offset('CSt', config.c_states)
+            if config.c1e is not None:
+                self.patcher.patch_setup_offset('C1E', config.c1e)
+            if config.pkg_c_state is not None:
+                self.patcher.patch_setup_offset('PkgC', config.pkg_c_state)
+            
+            # PCIe
+            if config.above_4g is not None:
+                self.patcher.patch_setup_offset('A4G', config.above_4g)
+            if config.resizable_bar is not None:
+                self.patcher.patch_setup_offset('RBar', config.resizable_bar)
         
         # ME disable
         if config.me_disable is not None and config.me_disable == 1:
             log.info("Setting HAP bit to disable ME")
             self.patcher.set_hap_bit(True)
         
-        self.stats.patches_applied = len(self.patcher.patches)
+        self.stats.patches_applied = self.patcher.changes
         log.info(f"[OK] Applied {self.stats.patches_applied} patches")
         
         return True
@@ -4,20 +4,148 @@ import sys
 import os
 import struct
 import logging
-from typing import Optional, Dict
+import functools
+from typing import Optional, Dict, Iterable, Tuple
+from collections import OrderedDict
 from pathlib import Path
 
 log = logging.getLogger(__name__)
 
+EFIVARS_PATH = '/sys/firmware/efi/efivars'
+
+# backup_all archive: magic, then per variable
+# [name_len:u16][name:utf-8][guid:16][attributes:u32][size:u32][data]
+BACKUP_ALL_MAGIC = b'G5NV'
+_BACKUP_NAME_LEN = struct.Struct('<H')
+_BACKUP_RECORD = struct.Struct('<16sII')
+
+# linux/fs.h ioctls for inode flags (what chattr uses under the hood)
+FS_IOC_GETFLAGS = 0x80086601
+FS_IOC_SETFLAGS = 0x40086602
+FS_IMMUTABLE_FL = 0x00000010
+
+
+@functools.lru_cache(maxsize=None)
+def _wide(s: str):
+    """Return a cached ctypes wide string for a Windows API LPCWSTR argument.
+    
+    Variable names and GUIDs repeat across calls, so the UTF-16 encoding is
+    done once per distinct string instead of on every API call.
+    """
+    import ctypes
+    return ctypes.c_wchar_p(s)
+
+
+def _set_immutable(path: Path, immutable: bool) -> bool:
+    """Set or clear the immutable inode flag in-process (no chattr fork/exec).
+    
+    Args:
+        path: File to modify
+        immutable: True to set the flag, False to clear it
+    
+    Returns:
+        True if successful
+    """
+    import fcntl
+    import array
+    
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        flags = array.array('i', [0])
+        fcntl.ioctl(fd, FS_IOC_GETFLAGS, flags, True)
+        
+        new_flags = flags[0] | FS_IMMUTABLE_FL if immutable else flags[0] & ~FS_IMMUTABLE_FL
+        if new_flags != flags[0]:
+            flags[0] = new_flags
+            fcntl.ioctl(fd, FS_IOC_SETFLAGS, flags)
+        return True
+    except OSError as e:
+        log.debug(f"Failed to {'set' if immutable else 'clear'} immutable flag on {path}: {e}")
+        return False
+    finally:
+        os.close(fd)
+
+
+def _mount_efivarfs() -> bool:
+    """Mount efivarfs via libc mount(2) instead of shelling out to mount.
+    
+    Returns:
+        True if efivarfs is (now) mounted
+    """
+    if os.path.ismount(EFIVARS_PATH):
+        return True
+    
+    try:
+        import ctypes
+        import ctypes.util
+        
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.mount.restype = ctypes.c_int
+        libc.mount.argtypes = [
+            ctypes.c_char_p,   # source
+            ctypes.c_char_p,   # target
+            ctypes.c_char_p,   # filesystemtype
+            ctypes.c_ulong,    # mountflags
+            ctypes.c_void_p    # data
+        ]
+        
+        if libc.mount(b"none", EFIVARS_PATH.encode(), b"efivarfs", 0, None) != 0:
+            errno = ctypes.get_errno()
+            log.error(f"Failed to mount efivarfs: {os.strerror(errno)}")
+            return False
+        
+        log.info(f"Mounted efivarfs at {EFIVARS_PATH}")
+        return True
+    
+    except Exception as e:
+        log.error(f"Failed to mount efivarfs: {e}")
+        return False
+
 
 class NVRAMAccess:
     """Cross-platform EFI variable access."""
     
-    def __init__(self):
+    READ_CACHE_SIZE = 64
+    
+    def __init__(self, cache_reads: bool = False):
+        """Initialize NVRAM access.
+        
+        Args:
+            cache_reads: Keep an LRU cache of recently read variables so
+                re-reads (e.g. verify after write) skip the firmware call.
+                Writes through this object invalidate the cached entry.
+        """
         self.platform = sys.platform
         self.can_access = False
+        self._read_cache_enabled = cache_reads
+        self._read_cache: OrderedDict = OrderedDict()
         self._check_access()
     
+    def _cache_get(self, name: str, guid: str) -> Optional[tuple]:
+        """Return cached (data, attributes) for a variable, if any."""
+        if not self._read_cache_enabled:
+            return None
+        key = (name, guid.strip('{}').upper())
+        entry = self._read_cache.get(key)
+        if entry is not None:
+            self._read_cache.move_to_end(key)
+        return entry
+    
+    def _cache_put(self, name: str, guid: str, data: Optional[bytes],
+                   attributes: Optional[int]) -> None:
+        """Store a successful read in the LRU cache."""
+        if not self._read_cache_enabled or data is None:
+            return
+        key = (name, guid.strip('{}').upper())
+        self._read_cache[key] = (data, attributes)
+        self._read_cache.move_to_end(key)
+        if len(self._read_cache) > self.READ_CACHE_SIZE:
+            self._read_cache.popitem(last=False)
+    
+    def _cache_invalidate(self, name: str, guid: str) -> None:
+        """Drop a variable from the read cache."""
+        self._read_cache.pop((name, guid.strip('{}').upper()), None)
+    
     def _check_access(self) -> None:
         """Check if we have access to EFI variables."""
         if self.platform == 'win32':
@@ -52,10 +180,19 @@ class NVRAMAccess:
             log.error("No NVRAM access - need admin/root privileges")
             return None
         
+        cached = self._cache_get(name, guid)
+        if cached is not None:
+            return cached[0]
+        
         if self.platform == 'win32':
-            data, _ = self._read_windows_with_attrs(name, guid)
+            data, attributes = self._read_windows_with_attrs(name, guid)
+            self._cache_put(name, guid, data, attributes)
             return data
         elif self.platform.startswith('linux'):
+            if self._read_cache_enabled:
+                data, attributes = self._read_linux_with_attrs(name, guid)
+                self._cache_put(name, guid, data, attributes)
+                return data
             return self._read_linux(name, guid)
         
         return None
@@ -74,12 +211,19 @@ class NVRAMAccess:
             log.error("No NVRAM access - need admin/root privileges")
             return None, None
         
+        cached = self._cache_get(name, guid)
+        if cached is not None:
+            return cached
+        
         if self.platform == 'win32':
-            return self._read_windows_with_attrs(name, guid)
+            data, attributes = self._read_windows_with_attrs(name, guid)
         elif self.platform.startswith('linux'):
-            return self._read_linux_with_attrs(name, guid)
+            data, attributes = self._read_linux_with_attrs(name, guid)
+        else:
+            return None, None
         
-        return None, None
+        self._cache_put(name, guid, data, attributes)
+        return data, attributes
     
     def write_variable(self, name: str, guid: str, data: bytes, 
                        attributes: int = 0x07) -> bool:
@@ -98,6 +242,8 @@ class NVRAMAccess:
             log.error("No NVRAM access - need admin/root privileges")
             return False
         
+        self._cache_invalidate(name, guid)
+        
         if self.platform == 'win32':
             # Try direct write first
             if self._write_windows(name, guid, data, attributes):
@@ -137,7 +283,7 @@ class NVRAMAccess:
                 ]
                 
                 result = kernel32.SetFirmwareEnvironmentVariableExW(
-                    name, guid_formatted, None, 0, attributes
+                    _wide(name), _wide(guid_formatted), None, 0, attributes
                 )
                 
                 if result == 0:
@@ -148,7 +294,7 @@ class NVRAMAccess:
                     ]
                     
                     result = kernel32.SetFirmwareEnvironmentVariableW(
-                        name, guid_formatted, None, 0
+                        _wide(name), _wide(guid_formatted), None, 0
                     )
             except (AttributeError, OSError):
                 # Ex version not available, use standard
@@ -158,7 +304,7 @@ class NVRAMAccess:
                 ]
                 
                 result = kernel32.SetFirmwareEnvironmentVariableW(
-                    name, guid_formatted, None, 0
+                    _wide(name), _wide(guid_formatted), None, 0
                 )
             
             if result == 0:
@@ -211,12 +357,12 @@ class NVRAMAccess:
                 attrs = wintypes.DWORD(0)
                 
                 size = kernel32.GetFirmwareEnvironmentVariableExW(
-                    name, guid_formatted, buffer, SAFE_BUFFER_SIZE, ctypes.byref(attrs)
+                    _wide(name), _wide(guid_formatted), buffer, SAFE_BUFFER_SIZE, ctypes.byref(attrs)
                 )
                 
                 if size > 0:
                     log.debug(f"Read variable {name} with attributes 0x{attrs.value:02x}")
-                    return buffer.raw[:size], attrs.value
+                    return ctypes.string_at(buffer, size), attrs.value
                     
             except (AttributeError, OSError) as e:
                 log.debug(f"GetFirmwareEnvironmentVariableExW not available, using standard read")
@@ -268,7 +414,7 @@ class NVRAMAccess:
             
             # Directly attempt to read the variable into the large buffer
             size = kernel32.GetFirmwareEnvironmentVariableW(
-                name, guid_formatted, buffer, SAFE_BUFFER_SIZE
+                _wide(name), _wide(guid_formatted), buffer, SAFE_BUFFER_SIZE
             )
             
             error_code = ctypes.get_last_error()
@@ -291,7 +437,8 @@ class NVRAMAccess:
                     return None
             
             # The function returned the number of bytes successfully read
-            return buffer.raw[:size]
+            # Copy only the bytes read, not the whole 16KB buffer
+            return ctypes.string_at(buffer, size)
         
         except Exception as e:
             log.error(f"Windows NVRAM read error: {e}")
@@ -304,7 +451,9 @@ class NVRAMAccess:
         NOTE: Windows uses SetFirmwareEnvironmentVariableExW for writing with attributes.
         The regular SetFirmwareEnvironmentVariableW doesn't support setting attributes.
         
-        CRITICAL: Must create a C buffer from Python bytes object for proper memory handling.
+        The data is passed straight through as pValue: ctypes hands the API a
+        pointer into the bytes object itself, and the write APIs never modify
+        the input, so no intermediate C buffer copy is needed.
         """
         try:
             import ctypes
@@ -319,8 +468,9 @@ class NVRAMAccess:
             # Format GUID with braces for Windows API (needed for both functions)
             guid_formatted = self._parse_guid(guid)
             
-            # Create C buffer from Python bytes - CRITICAL for proper memory handling
-            data_buffer = ctypes.create_string_buffer(data, len(data))
+            # bytes is already a contiguous C buffer that LPVOID accepts zero-copy
+            # (bytes() is a no-op for bytes input, only bytearray gets copied)
+            data = bytes(data)
             
             # Try SetFirmwareEnvironmentVariableExW first (supports attributes)
             try:
@@ -333,9 +483,9 @@ class NVRAMAccess:
                     wintypes.DWORD     # dwAttributes
                 ]
                 
-                # Call with attributes, passing C buffer
+                # Call with attributes, passing the data buffer directly
                 result = kernel32.SetFirmwareEnvironmentVariableExW(
-                    name, guid_formatted, data_buffer, len(data), attributes
+                    _wide(name), _wide(guid_formatted), data, len(data), attributes
                 )
                 
                 if result != 0:
@@ -359,9 +509,9 @@ class NVRAMAccess:
                 wintypes.DWORD     # nSize (NO attributes parameter)
             ]
             
-            # Call WITHOUT attributes parameter, passing C buffer
+            # Call WITHOUT attributes parameter, passing the data buffer directly
             result = kernel32.SetFirmwareEnvironmentVariableW(
-                name, guid_formatted, data_buffer, len(data)
+                _wide(name), _wide(guid_formatted), data, len(data)
             )
             
             if result == 0:
@@ -378,15 +528,15 @@ class NVRAMAccess:
     
     def _enable_privilege(self) -> bool:
         """Enable SeSystemEnvironmentPrivilege on Windows."""
+        # Admin status was already checked once by _check_access
+        if not self.can_access:
+            log.error("Not running as Administrator")
+            return False
+        
         try:
             import ctypes
             from ctypes import wintypes, byref
             
-            # Check if user is admin first
-            if ctypes.windll.shell32.IsUserAnAdmin() == 0:
-                log.error("Not running as Administrator")
-                return False
-            
             # Windows API constants
             TOKEN_ADJUST_PRIVILEGES = 0x0020
             TOKEN_QUERY = 0x0008
@@ -472,7 +622,7 @@ class NVRAMAccess:
                 luid = LUID()
                 if not advapi32.LookupPrivilegeValueW(
                     None,
-                    "SeSystemEnvironmentPrivilege",
+                    _wide("SeSystemEnvironmentPrivilege"),
                     byref(luid)
                 ):
                     error_code = ctypes.get_last_error()
@@ -563,7 +713,7 @@ class NVRAMAccess:
             
             # If exists, make writable
             if var_path.exists():
-                os.system(f'chattr -i {var_path}')
+                _set_immutable(var_path, False)
             
             # Prepend attributes
             full_data = struct.pack('<I', attributes) + data
@@ -572,7 +722,7 @@ class NVRAMAccess:
             var_path.write_bytes(full_data)
             
             # Make immutable again
-            os.system(f'chattr +i {var_path}')
+            _set_immutable(var_path, True)
             
             return True
         
@@ -608,6 +758,72 @@ class NVRAMAccess:
         log.info(f"Setup backed up to {backup_path} ({len(data)} bytes, attrs=0x{attributes:02x})")
         return True
     
+    def backup_all(self, backup_path: str,
+                   variables: Optional[Iterable[Tuple[str, str]]] = None) -> int:
+        """Backup many EFI variables into a single archive in one pass.
+        
+        On Linux the efivarfs directory is walked once; on Windows (which has
+        no enumeration API) the variables to save must be given explicitly.
+        
+        Args:
+            backup_path: Output archive path
+            variables: Iterable of (name, guid) pairs, or None for all (Linux only)
+        
+        Returns:
+            Number of variables backed up
+        """
+        import uuid
+        
+        if not self.can_access:
+            log.error("No NVRAM access - need admin/root privileges")
+            return 0
+        
+        out = bytearray(BACKUP_ALL_MAGIC)
+        count = 0
+        
+        def add_record(name: str, guid: str, attributes: int, data: bytes) -> None:
+            name_bytes = name.encode('utf-8')
+            out.extend(_BACKUP_NAME_LEN.pack(len(name_bytes)))
+            out.extend(name_bytes)
+            out.extend(_BACKUP_RECORD.pack(uuid.UUID(guid).bytes_le, attributes, len(data)))
+            out.extend(data)
+        
+        if variables is None:
+            if not self.platform.startswith('linux'):
+                log.error("Variable enumeration is only supported on Linux")
+                return 0
+            
+            with os.scandir(EFIVARS_PATH) as entries:
+                for entry in entries:
+                    # efivarfs naming: VariableName-xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx
+                    name, guid = entry.name[:-37], entry.name[-36:]
+                    try:
+                        fd = os.open(entry.path, os.O_RDONLY)
+                        try:
+                            raw = b''.join(iter(lambda: os.read(fd, 65536), b''))
+                        finally:
+                            os.close(fd)
+                        
+                        if len(raw) < 4:
+                            continue
+                        
+                        add_record(name, guid, struct.unpack_from('<I', raw)[0], raw[4:])
+                        count += 1
+                    except (OSError, ValueError) as e:
+                        log.warning(f"Skipping {entry.name}: {e}")
+        else:
+            for name, guid in variables:
+                data, attributes = self.read_variable_with_attributes(name, guid)
+                if data is None:
+                    log.warning(f"Skipping {name}-{guid}: not readable")
+                    continue
+                add_record(name, guid, attributes, data)
+                count += 1
+        
+        Path(backup_path).write_bytes(out)
+        log.info(f"Backed up {count} variables to {backup_path} ({len(out)} bytes)")
+        return count
+    
     def restore_setup(self, backup_path: str) -> bool:
         """Restore Setup variable from file with original attributes."""
         setup_guid = "EC87D643-EBA4-4BB5-A1E5-3F3E36B20DA9"
@@ -642,6 +858,12 @@ def print_nvram_report() -> None:
             print("  1. Run as Administrator")
             print("  2. Ensure SeSystemEnvironmentPrivilege is enabled")
         elif nvram.platform.startswith('linux'):
+            if Path('/sys/firmware/efi').exists() and not os.path.ismount(EFIVARS_PATH):
+                print("\nefivarfs is not mounted, attempting to mount it...")
+                if _mount_efivarfs():
+                    print("  [OK] efivarfs mounted - re-run to check access")
+                else:
+                    print("  [FAIL] Mount failed")
             print("\nTo enable NVRAM access on Linux:")
             print("  1. Run as root (sudo)")
             print("  2. Ensure efivarfs is mounted: mount -t efivarfs none /sys/firmware/efi/efivars")
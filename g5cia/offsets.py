@@ -1,6 +1,8 @@
 """Dell G5 5090 BIOS offset definitions."""
 
-from typing import Dict, Any
+from array import array
+from functools import cache, lru_cache
+from typing import Dict, Any, Optional
 
 # Dell G5 5090 Setup variable offsets
 # Format: 'name': (offset, size, description)
@@ -149,20 +151,66 @@ OFFSETS: Dict[str, tuple[int, int, str]] = {
 }
 
 
+# Struct-of-arrays view of OFFSETS, built once at import
+_names: tuple[str, ...] = tuple(OFFSETS)
+_name_to_idx: Dict[str, int] = {name: i for i, name in enumerate(_names)}
+_offsets = array('I', (v[0] for v in OFFSETS.values()))
+_sizes = array('B', (v[1] for v in OFFSETS.values()))
+_descs: tuple[str, ...] = tuple(v[2] for v in OFFSETS.values())
+
+
+@lru_cache(maxsize=256)
+def get_offset_or_none(name: str) -> Optional[tuple[int, int]]:
+    """Get offset and size for a setting by name, or None if unknown."""
+    i = _name_to_idx.get(name)
+    if i is None:
+        return None
+    return _offsets[i], _sizes[i]
+
+
 def get_offset(name: str) -> tuple[int, int]:
     """Get offset and size for a setting by name."""
-    if name not in OFFSETS:
+    loc = get_offset_or_none(name)
+    if loc is None:
         raise KeyError(f"Unknown offset: {name}")
-    return OFFSETS[name][0], OFFSETS[name][1]
+    return loc
 
 
+@lru_cache(maxsize=256)
 def get_description(name: str) -> str:
     """Get description for a setting by name."""
-    if name not in OFFSETS:
+    i = _name_to_idx.get(name)
+    if i is None:
         return "Unknown"
-    return OFFSETS[name][2]
+    return _descs[i]
+
+
+@cache
+def _offset_table() -> tuple[tuple[str, int, int, str], ...]:
+    return tuple(zip(_names, _offsets, _sizes, _descs))
 
 
 def list_offsets() -> list[tuple[str, int, int, str]]:
     """List all offsets with details."""
-    return [(name, off, sz, desc) for name, (off, sz, desc) in OFFSETS.items()]
+    return list(_offset_table())
+
+
+# Lock bits cleared by Patcher.unlock_all
+UNLOCK_SETTINGS: tuple[str, ...] = ('CfgLk', 'OcLk', 'PlLk', 'BiosLk', 'PkgLk', 'TdpLk')
+
+
+def _contiguous_groups(names: tuple[str, ...]) -> tuple[tuple[int, int, tuple[str, ...]], ...]:
+    """Group settings into runs of adjacent bytes as (start, size, names)."""
+    groups: list[tuple[int, int, tuple[str, ...]]] = []
+    for name in sorted(names, key=lambda n: OFFSETS[n][0]):
+        offset, size = OFFSETS[name][0], OFFSETS[name][1]
+        if groups and groups[-1][0] + groups[-1][1] == offset:
+            start, run, members = groups[-1]
+            groups[-1] = (start, run + size, members + (name,))
+        else:
+            groups.append((offset, size, (name,)))
+    return tuple(groups)
+
+
+# Contiguous runs of UNLOCK_SETTINGS, so each run is one patch
+UNLOCK_GROUPS = _contiguous_groups(UNLOCK_SETTINGS)
@@ -1,22 +1,44 @@
 """BIOS patching operations with validation."""
 
+import io
+import os
 import struct
 import logging
-from typing import List, Optional, Tuple, Dict
+from bisect import bisect_left, insort
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Optional, Tuple, Dict, Iterator
 from dataclasses import dataclass
 
 from .utils import (
     encode_power_limit, decode_power_limit,
     encode_voltage_offset, decode_voltage_offset,
-    encode_tau, checksum8, checksum16,
+    encode_tau, checksum8, checksum16, checksum32, crc32,
     try_lzma_compress, hexdump
 )
-from .offsets import get_offset
+from .offsets import OFFSETS, get_description, UNLOCK_GROUPS
 
 log = logging.getLogger(__name__)
 
+# Microcode update header: hdr_ver, update_rev, date, proc_sig, checksum,
+# (loader_rev, flags, data_size), total_size
+_UCODE_HDR = struct.Struct('<5I12xI')
 
-@dataclass
+_ZERO2 = b'\x00\x00'
+
+
+class _LazyHex:
+    """Defer bytes.hex() until a log record is actually emitted."""
+    __slots__ = ('data',)
+    
+    def __init__(self, data: bytes):
+        self.data = data
+    
+    def __str__(self) -> str:
+        return self.data.hex()
+
+
+@dataclass(slots=True)
 class Patch:
     """A single patch operation."""
     offset: int
@@ -29,25 +51,119 @@ class Patch:
 class Patcher:
     """BIOS patcher with validation and logging."""
     
-    def __init__(self, data: bytes):
-        self.data = bytearray(data)
+    def __init__(self, data: bytes, in_place: bool = False):
+        # Copy-on-write: the source is only copied into a bytearray on the
+        # first patch that actually changes bytes, so callers must not modify
+        # a mutable source buffer after handing it over. With in_place, a
+        # writable buffer (bytearray, mmap or memoryview) is patched directly;
+        # a read-only one raises TypeError
+        self._src = data
+        self._data: Optional[bytearray] = None
+        # Zero-copy view for comparisons; only materialize bytes for Patch records
+        self._mv = memoryview(data).toreadonly()
+        if in_place:
+            self.data = data
         self.patches: List[Patch] = []
+        # Patch operations that changed bytes; writes merged by batch() count separately
+        self.changes = 0
         self.setup_base: Optional[int] = None
+        self._abs: Dict[str, Tuple[int, int, str]] = {}
+        # Deferred byte writes {offset: (value, description, setting)} while inside batch()
+        self._pending: Optional[Dict[int, Tuple[int, str, str]]] = None
+        # Applied patch ranges as sorted (start, end, description) for overlap checks
+        self._intervals: List[Tuple[int, int, str]] = []
+        self._max_patch_len = 0
+    
+    @property
+    def data(self) -> bytearray:
+        """Current image contents as a mutable buffer.
+        
+        This is the private bytearray copy (materialized on first access if
+        nothing has been patched yet), or the caller's buffer with in_place.
+        """
+        return self._writable()
+    
+    @data.setter
+    def data(self, buf) -> None:
+        """Patch a caller-owned mutable buffer in place instead of a private copy."""
+        if memoryview(buf).readonly:
+            raise TypeError(f"Cannot patch a read-only {type(buf).__name__} in place")
+        self._src = buf
+        self._data = buf
+        self._mv = memoryview(buf)
+    
+    def _writable(self) -> bytearray:
+        """Materialize the private bytearray copy on first mutation."""
+        if self._data is None:
+            self._data = bytearray(self._src)
+            self._mv = memoryview(self._data)
+        return self._data
+    
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Write-combine patches made inside the block.
+        
+        patch_byte/patch_word/patch_bytes calls are buffered and, on exit,
+        adjacent offsets are coalesced into one patch_bytes call per run.
+        Buffered writes are not visible through `data` until the block
+        exits, and are discarded if it raises. `changes` still counts each
+        buffered setting that changed bytes, not each merged run.
+        """
+        if self._pending is not None:
+            yield
+            return
+        
+        self._pending = {}
+        try:
+            yield
+        except BaseException:
+            self._pending = None
+            raise
+        
+        pending, self._pending = self._pending, None
+        offsets = sorted(pending)
+        i = 0
+        while i < len(offsets):
+            j = i + 1
+            while j < len(offsets) and offsets[j] == offsets[j - 1] + 1:
+                j += 1
+            run = [pending[off] for off in offsets[i:j]]
+            desc = ', '.join(dict.fromkeys(d for _, d, _ in run))
+            # Settings in the run whose bytes actually change
+            changed = {k for off, (v, _, k) in zip(offsets[i:j], run) if self._mv[off] != v}
+            if self.patch_bytes(offsets[i], bytes(v for v, _, _ in run), desc) and changed:
+                self.changes += len(changed) - 1
+            i = j
+    
+    def _defer(self, offset: int, data: bytes, description: str, setting: Optional[str] = None) -> None:
+        """Buffer a write inside batch(); `setting` (default: description) is what `changes` counts."""
+        key = setting or description
+        for i, value in enumerate(data, offset):
+            self._pending[i] = (value, description, key)
     
     def set_setup_base(self, offset: int) -> None:
         """Set base offset for Setup variable."""
         self.setup_base = offset
+        # Resolve every named setting to (absolute offset, size, "name: description") once
+        self._abs = {
+            name: (offset + off, size, f"{name}: {desc}")
+            for name, (off, size, desc) in OFFSETS.items()
+        }
         log.info(f"Setup base set to 0x{offset:x}")
     
     def patch_byte(self, offset: int, value: int, description: str = "") -> bool:
         """Patch a single byte."""
-        if offset >= len(self.data):
+        if offset >= len(self._mv):
             log.error(f"Offset 0x{offset:x} beyond image size")
             return False
         
-        old_val = self.data[offset]
+        if self._pending is not None:
+            self._defer(offset, bytes([value]), description or f"Patch byte at 0x{offset:x}")
+            return True
+        
+        old_val = self._mv[offset]
         if old_val == value:
-            log.debug(f"Byte at 0x{offset:x} already {value:02X}")
+            log.debug("Byte at 0x%x already %02X", offset, value)
             return True
         
         patch = Patch(
@@ -59,23 +175,29 @@ class Patcher:
         
         self._check_overlap(patch)
         self.patches.append(patch)
-        self.data[offset] = value
+        self.changes += 1
+        self._writable()[offset] = value
         patch.applied = True
         
-        log.info(f"Patched 0x{offset:x}: 0x{old_val:02X} -> 0x{value:02X} ({description})")
+        log.info("Patched 0x%x: 0x%02X -> 0x%02X (%s)", offset, old_val, value, description)
         return True
     
     def patch_word(self, offset: int, value: int, description: str = "") -> bool:
         """Patch a 16-bit word (little-endian)."""
-        if offset + 2 > len(self.data):
+        if offset + 2 > len(self._mv):
             log.error(f"Offset 0x{offset:x} beyond image size")
             return False
         
-        old_data = self.data[offset:offset+2]
-        new_data = struct.pack('<H', value & 0xFFFF)
+        new_data = (value & 0xFFFF).to_bytes(2, 'little')
+        
+        if self._pending is not None:
+            self._defer(offset, new_data, description or f"Patch word at 0x{offset:x}")
+            return True
+        
+        old_data = self._mv[offset:offset+2]
         
         if old_data == new_data:
-            log.debug(f"Word at 0x{offset:x} already {value:04X}")
+            log.debug("Word at 0x%x already %04X", offset, value)
             return True
         
         patch = Patch(
@@ -87,22 +209,27 @@ class Patcher:
         
         self._check_overlap(patch)
         self.patches.append(patch)
-        self.data[offset:offset+2] = new_data
+        self.changes += 1
+        self._writable()[offset:offset+2] = new_data
         patch.applied = True
         
-        log.info(f"Patched 0x{offset:x}: 0x{old_data.hex()} -> 0x{new_data.hex()} ({description})")
+        log.info("Patched 0x%x: 0x%s -> 0x%s (%s)", offset, _LazyHex(patch.old_data), _LazyHex(new_data), description)
         return True
     
     def patch_bytes(self, offset: int, data: bytes, description: str = "") -> bool:
         """Patch multiple bytes."""
-        if offset + len(data) > len(self.data):
+        if offset + len(data) > len(self._mv):
             log.error(f"Patch at 0x{offset:x} would exceed image size")
             return False
         
-        old_data = self.data[offset:offset+len(data)]
+        if self._pending is not None:
+            self._defer(offset, data, description or f"Patch {len(data)} bytes at 0x{offset:x}")
+            return True
+        
+        old_data = self._mv[offset:offset+len(data)]
         
         if old_data == data:
-            log.debug(f"Bytes at 0x{offset:x} already match")
+            log.debug("Bytes at 0x%x already match", offset)
             return True
         
         patch = Patch(
@@ -114,22 +241,31 @@ class Patcher:
         
         self._check_overlap(patch)
         self.patches.append(patch)
-        self.data[offset:offset+len(data)] = data
+        self.changes += 1
+        self._writable()[offset:offset+len(data)] = data
         patch.applied = True
         
-        log.info(f"Patched 0x{offset:x} ({len(data)} bytes): {description}")
+        log.info("Patched 0x%x (%d bytes): %s", offset, len(data), description)
         return True
     
     def _check_overlap(self, patch: Patch) -> None:
-        """Check if patch overlaps with existing patches."""
-        for existing in self.patches:
-            if not existing.applied:
-                continue
-            
-            # Check if ranges overlap
-            if (patch.offset < existing.offset + len(existing.new_data) and
-                patch.offset + len(patch.new_data) > existing.offset):
-                log.warning(f"Patch overlap detected: {patch.description} overlaps with {existing.description}")
+        """Check if patch overlaps with existing patches, then record its range.
+        
+        Only intervals starting within the longest recorded patch length
+        before this one can overlap, so the candidates are found by bisection
+        instead of scanning every applied patch.
+        """
+        start = patch.offset
+        end = start + len(patch.new_data)
+        
+        lo = bisect_left(self._intervals, (start - self._max_patch_len + 1,))
+        hi = bisect_left(self._intervals, (end,))
+        for _, existing_end, existing_desc in self._intervals[lo:hi]:
+            if existing_end > start:
+                log.warning(f"Patch overlap detected: {patch.description} overlaps with {existing_desc}")
+        
+        insort(self._intervals, (start, end, patch.description))
+        self._max_patch_len = max(self._max_patch_len, end - start)
     
     def patch_setup_offset(self, name: str, value: int) -> bool:
         """Patch a Setup variable by name using offset map."""
@@ -137,16 +273,15 @@ class Patcher:
             log.error("Setup base not set - cannot patch Setup offsets")
             return False
         
-        offset, size = get_offset(name)
-        abs_offset = self.setup_base + offset
-        
-        from .offsets import get_description
-        desc = get_description(name)
+        entry = self._abs.get(name)
+        if entry is None:
+            raise KeyError(f"Unknown offset: {name}")
+        abs_offset, size, desc = entry
         
         if size == 1:
-            return self.patch_byte(abs_offset, value, f"{name}: {desc}")
+            return self.patch_byte(abs_offset, value, desc)
         elif size == 2:
-            return self.patch_word(abs_offset, value, f"{name}: {desc}")
+            return self.patch_word(abs_offset, value, desc)
         else:
             log.error(f"Unsupported size {size} for offset {name}")
             return False
@@ -187,12 +322,30 @@ class Patcher:
         return success
     
     def unlock_all(self) -> bool:
-        """Unlock all common lock bits."""
-        locks = ['CfgLk', 'OcLk', 'PlLk', 'BiosLk', 'PkgLk', 'TdpLk']
+        """Unlock all common lock bits.
+        
+        Adjacent lock bytes are cleared with a single patch per run, whose
+        description names every lock in it; `changes` counts each lock.
+        """
+        if self.setup_base is None:
+            log.error("Setup base not set - cannot patch Setup offsets")
+            return False
+        
         success = True
         
-        for lock in locks:
-            success &= self.patch_setup_offset(lock, 0)
+        with self.batch():
+            for start, size, names in UNLOCK_GROUPS:
+                offset = self.setup_base + start
+                if offset + size > len(self._mv):
+                    log.error(f"Patch at 0x{offset:x} would exceed image size")
+                    success = False
+                    continue
+                
+                desc = f"{', '.join(names)}: {', '.join(get_description(n) for n in names)}"
+                # Defer each lock under its own name; batch() merges the run back into one patch
+                for name in names:
+                    abs_offset, lock_size, _ = self._abs[name]
+                    self._defer(abs_offset, bytes(lock_size), desc, name)
         
         return success
     
@@ -206,12 +359,12 @@ class Patcher:
         # HAP bit is in PCH straps, not Setup
         # This is a direct firmware patch
         
-        if pch_offset + 4 > len(self.data):
+        if pch_offset + 4 > len(self._mv):
             log.error("PCH strap offset beyond image")
             return False
         
         # Read current value
-        current = struct.unpack('<I', self.data[pch_offset:pch_offset+4])[0]
+        current = int.from_bytes(self._mv[pch_offset:pch_offset+4], 'little')
         
         # HAP bit is typically bit 16
         if enable:
@@ -225,12 +378,12 @@ class Patcher:
         
         self.patch_bytes(
             pch_offset,
-            struct.pack('<I', new_val),
+            new_val.to_bytes(4, 'little'),
             f"{'Enable' if enable else 'Disable'} HAP bit (ME disable)"
         )
         
         # Read back to verify
-        verify = struct.unpack('<I', self.data[pch_offset:pch_offset+4])[0]
+        verify = int.from_bytes(self._mv[pch_offset:pch_offset+4], 'little')
         if verify != new_val:
             log.error("HAP bit read-back verification failed!")
             return False
@@ -238,89 +391,135 @@ class Patcher:
         log.info(f"HAP bit {'enabled' if enable else 'disabled'} and verified")
         return True
     
-    def inject_microcode(self, ucode_data: bytes, cpuid: int, inject_offset: int) -> bool:
-        """Inject microcode update with full validation.
+    @staticmethod
+    def _validate_microcode(ucode_data: bytes, cpuid: int) -> Optional[Tuple[int, int, int]]:
+        """Validate a microcode update header and checksum.
         
-        Args:
-            ucode_data: Complete microcode update binary
-            cpuid: Expected CPUID for validation
-            inject_offset: Offset to inject at
+        Touches no Patcher state, so it is safe to run from worker threads.
+        
+        Returns:
+            Tuple of (proc_sig, update_rev, date), or None if invalid
         """
         # Validate microcode header
         if len(ucode_data) < 0x30:
             log.error("Microcode data too small")
-            return False
+            return None
         
         # Parse header
-        hdr_ver = struct.unpack('<I', ucode_data[0:4])[0]
-        update_rev = struct.unpack('<I', ucode_data[4:8])[0]
-        date = struct.unpack('<I', ucode_data[8:12])[0]
-        proc_sig = struct.unpack('<I', ucode_data[12:16])[0]
-        checksum = struct.unpack('<I', ucode_data[16:20])[0]
-        total_size = struct.unpack('<I', ucode_data[32:36])[0]
+        hdr_ver, update_rev, date, proc_sig, checksum, total_size = _UCODE_HDR.unpack_from(ucode_data, 0)
         
         # Validate
         if hdr_ver != 1:
             log.error(f"Invalid microcode header version: {hdr_ver}")
-            return False
+            return None
         
         if proc_sig != cpuid:
             log.error(f"CPUID mismatch: expected 0x{cpuid:08X}, got 0x{proc_sig:08X}")
-            return False
+            return None
         
         if len(ucode_data) != total_size:
             log.error(f"Size mismatch: expected {total_size}, got {len(ucode_data)}")
-            return False
+            return None
         
         # Validate checksum (simple sum of all DWORDs should be 0)
-        dwords = len(ucode_data) // 4
-        total = sum(struct.unpack('<I', ucode_data[i:i+4])[0] for i in range(0, dwords * 4, 4))
-        if total & 0xFFFFFFFF != 0:
+        total = checksum32(ucode_data)
+        if total != 0:
             log.warning(f"Microcode checksum validation failed (sum: 0x{total:08X})")
         
+        return proc_sig, update_rev, date
+    
+    def _inject_validated_microcode(self, ucode_data: bytes, inject_offset: int,
+                                    header: Tuple[int, int, int]) -> bool:
+        """Patch in a microcode update that already passed validation."""
+        proc_sig, update_rev, date = header
         log.info(f"Injecting microcode: CPUID 0x{proc_sig:08X}, rev {update_rev}, date {date:08X}")
-        
-        # Inject
         return self.patch_bytes(inject_offset, ucode_data, f"Microcode update (CPUID 0x{proc_sig:08X})")
     
+    def inject_microcode(self, ucode_data: bytes, cpuid: int, inject_offset: int) -> bool:
+        """Inject microcode update with full validation.
+        
+        Args:
+            ucode_data: Complete microcode update binary
+            cpuid: Expected CPUID for validation
+            inject_offset: Offset to inject at
+        """
+        header = self._validate_microcode(ucode_data, cpuid)
+        if header is None:
+            return False
+        
+        return self._inject_validated_microcode(ucode_data, inject_offset, header)
+    
+    def inject_microcodes(self, blobs: List[Tuple[bytes, int, int]]) -> bool:
+        """Inject several microcode updates, validating them in parallel.
+        
+        Header parsing and checksums run on a thread pool (the NumPy
+        checksum releases the GIL); the image itself is only patched from
+        the calling thread, in the order given. Invalid blobs are skipped.
+        
+        Args:
+            blobs: List of (ucode_data, cpuid, inject_offset) tuples
+        
+        Returns:
+            True if every update was injected
+        """
+        if not blobs:
+            return True
+        
+        with ThreadPoolExecutor(max_workers=min(len(blobs), os.cpu_count() or 1)) as pool:
+            headers = list(pool.map(lambda b: self._validate_microcode(b[0], b[1]), blobs))
+        
+        success = True
+        for (ucode_data, _, inject_offset), header in zip(blobs, headers):
+            if header is None:
+                success = False
+                continue
+            success &= self._inject_validated_microcode(ucode_data, inject_offset, header)
+        
+        return success
+    
     def recalc_fv_checksum(self, fv_offset: int) -> bool:
         """Recalculate firmware volume header checksum."""
-        if fv_offset + 0x38 > len(self.data):
+        if fv_offset + 0x38 > len(self._mv):
             log.error("FV header beyond image")
             return False
         
         # Zero out existing checksum (at offset 0x32)
-        self.data[fv_offset + 0x32:fv_offset + 0x34] = b'\x00\x00'
+        self._writable()[fv_offset + 0x32:fv_offset + 0x34] = _ZERO2
         
         # Calculate new checksum
-        header = self.data[fv_offset:fv_offset+0x38]
+        header = self._mv[fv_offset:fv_offset+0x38]
         new_checksum = checksum16(header)
         
         # Write new checksum
-        self.data[fv_offset + 0x32:fv_offset + 0x34] = struct.pack('<H', new_checksum)
+        self._writable()[fv_offset + 0x32:fv_offset + 0x34] = new_checksum.to_bytes(2, 'little')
         
         log.info(f"Recalculated FV checksum at 0x{fv_offset:x}: 0x{new_checksum:04X}")
         return True
     
     def get_patch_summary(self) -> str:
         """Get summary of all patches."""
-        lines = [f"\n{'='*70}"]
-        lines.append("PATCH SUMMARY")
-        lines.append(f"{'='*70}")
-        lines.append(f"Total patches: {len(self.patches)}")
-        lines.append("")
+        rule = '=' * 70
+        buf = io.StringIO()
+        w = buf.write
+        upper = str.upper
+        w(f"\n{rule}\nPATCH SUMMARY\n{rule}\nTotal patches: {len(self.patches)}\n\n")
         
         for i, patch in enumerate(self.patches, 1):
-            lines.append(f"{i}. {patch.description}")
-            lines.append(f"   Offset: 0x{patch.offset:08X}")
-            lines.append(f"   Before: {patch.old_data.hex().upper()}")
-            lines.append(f"   After:  {patch.new_data.hex().upper()}")
-            lines.append(f"   Applied: {'[OK]' if patch.applied else '[FAIL]'}")
-            lines.append("")
-        
-        lines.append(f"{'='*70}\n")
-        return '\n'.join(lines)
+            w(f"{i}. {patch.description}\n"
+              f"   Offset: 0x{patch.offset:08X}\n"
+              f"   Before: {upper(patch.old_data.hex())}\n"
+              f"   After:  {upper(patch.new_data.hex())}\n"
+              f"   Applied: {'[OK]' if patch.applied else '[FAIL]'}\n\n")
+        
+        w(f"{rule}\n")
+        return buf.getvalue()
+    
+    def fingerprint(self) -> int:
+        """CRC32 of the current (patched) image, for before/after integrity checks."""
+        return crc32(self._mv)
     
     def get_data(self) -> bytes:
         """Get patched data."""
-        return bytes(self.data)
+        if self._data is None:
+            return bytes(self._src)
+        return bytes(self._data)
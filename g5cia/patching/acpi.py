@@ -6,8 +6,30 @@ from typing import List, Optional, Dict
 from dataclasses import dataclass
 from pathlib import Path
 
+from ..utils import checksum8, crc32, find_all
+
+# NumPy is optional; it only accelerates whole-image scans
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
 log = logging.getLogger(__name__)
 
+_U32 = struct.Struct('<I')
+
+# ACPI table header: signature, length, revision, checksum, OEM ID,
+# OEM table ID, OEM revision, creator ID, creator revision (36 bytes)
+_ACPI_HDR = struct.Struct('<4sIBB6s8sI4sI')
+
+# Common ACPI table signatures
+ACPI_SIGNATURES = (
+    b'DSDT', b'SSDT', b'FADT', b'MADT', b'MCFG',
+    b'HPET', b'WAET', b'BGRT', b'FPDT', b'DMAR',
+)
+
 
 @dataclass
 class ACPITable:
@@ -42,12 +64,30 @@ class ACPIPatcher:
         """Initialize with BIOS data.
         
         Args:
-            bios_data: Raw BIOS firmware data
+            bios_data: Raw BIOS firmware data (bytes, bytearray or a read-only mmap)
         """
-        self.bios_data = bytearray(bios_data)
+        # Copy-on-write: the source is only copied into a bytearray on the
+        # first write, so callers must not modify a mutable source buffer
+        # after handing it over
+        self._src = bios_data
+        self._data: Optional[bytearray] = None
+        # Zero-copy view for read-only slicing
+        self._mv = memoryview(bios_data).toreadonly()
         self.tables: Dict[str, List[ACPITable]] = {}
         self.rsdp_offset: Optional[int] = None
-        
+    
+    @property
+    def bios_data(self):
+        """Current image contents (the source buffer until the first write)."""
+        return self._data if self._data is not None else self._src
+    
+    def _writable(self) -> bytearray:
+        """Materialize the private bytearray copy on first mutation."""
+        if self._data is None:
+            self._data = bytearray(self._src)
+            self._mv = memoryview(self._data)
+        return self._data
+    
     def list_tables(self) -> List[ACPITable]:
         """Find and list all ACPI tables.
         
@@ -103,14 +143,14 @@ class ACPIPatcher:
         ]
         
         for start, end in search_ranges:
-            pos = start
-            while pos < end - 8:
-                if self.bios_data[pos:pos + 8] == self.RSDP_SIGNATURE:
-                    # Verify checksum
-                    if self._verify_rsdp_checksum(pos):
-                        return pos
+            for pos in find_all(self.bios_data, self.RSDP_SIGNATURE, start, end - 1):
+                # RSDP is 16-byte aligned
+                if (pos - start) & 15:
+                    continue
                 
-                pos += 16  # RSDP is 16-byte aligned
+                # Verify checksum
+                if self._verify_rsdp_checksum(pos):
+                    return pos
         
         return None
     
@@ -126,11 +166,9 @@ class ACPIPatcher:
         if offset + 20 > len(self.bios_data):
             return False
         
-        # RSDP 1.0 is 20 bytes
-        rsdp_data = self.bios_data[offset:offset + 20]
-        
-        checksum = sum(rsdp_data) & 0xFF
-        return checksum == 0
+        # RSDP 1.0 is 20 bytes. Only aligned signature hits get here, so a
+        # builtin sum over the view beats prefix-summing the search range
+        return sum(self._mv[offset:offset + 20]) & 0xFF == 0
     
     def _parse_rsdp(self, offset: int) -> List[int]:
         """Parse RSDP to get table pointers.
@@ -147,28 +185,22 @@ class ACPIPatcher:
             return tables
         
         # Read RSDT pointer (offset 16-19 in RSDP 1.0)
-        rsdt_ptr = struct.unpack('<I', self.bios_data[offset + 16:offset + 20])[0]
+        rsdt_ptr = _U32.unpack_from(self.bios_data, offset + 16)[0]
         
         # For simplicity, search for table signatures directly
         # A full implementation would parse RSDT/XSDT pointer arrays
         
-        # Common ACPI table signatures
-        signatures = [
-            b'DSDT', b'SSDT', b'FADT', b'MADT', b'MCFG',
-            b'HPET', b'WAET', b'BGRT', b'FPDT', b'DMAR',
-        ]
-        
-        for sig in signatures:
-            pos = 0
-            while pos < len(self.bios_data) - 4:
-                if self.bios_data[pos:pos + 4] == sig:
-                    # Verify it looks like a valid ACPI table
-                    if self._is_valid_table_header(pos):
-                        tables.append(pos)
-                        pos += 36  # Skip this table's header
-                        continue
+        end = len(self.bios_data) - 1
+        for sig in ACPI_SIGNATURES:
+            next_pos = 0
+            for pos in find_all(self.bios_data, sig, 0, end):
+                if pos < next_pos:
+                    continue
                 
-                pos += 1
+                # Verify it looks like a valid ACPI table
+                if self._is_valid_table_header(pos):
+                    tables.append(pos)
+                    next_pos = pos + 36  # Skip this table's header
         
         return tables
     
@@ -185,7 +217,7 @@ class ACPIPatcher:
             return False
         
         # Read length field (offset 4-7)
-        length = struct.unpack('<I', self.bios_data[offset + 4:offset + 8])[0]
+        length = _U32.unpack_from(self.bios_data, offset + 4)[0]
         
         # Sanity check
         if length < 36 or length > 1024 * 1024:  # Min 36 bytes, max 1MB
@@ -219,24 +251,18 @@ class ACPIPatcher:
         # 28-31: Creator ID
         # 32-35: Creator Revision
         
-        signature = self.bios_data[offset:offset + 4].decode('ascii', errors='ignore')
-        length = struct.unpack('<I', self.bios_data[offset + 4:offset + 8])[0]
-        revision = self.bios_data[offset + 8]
-        oem_id = self.bios_data[offset + 10:offset + 16].decode('ascii', errors='ignore').strip('\x00')
-        oem_table_id = self.bios_data[offset + 16:offset + 24].decode('ascii', errors='ignore').strip('\x00')
-        oem_revision = struct.unpack('<I', self.bios_data[offset + 24:offset + 28])[0]
-        creator_id = self.bios_data[offset + 28:offset + 32].decode('ascii', errors='ignore').strip('\x00')
-        creator_revision = struct.unpack('<I', self.bios_data[offset + 32:offset + 36])[0]
+        (signature, length, revision, _checksum, oem_id, oem_table_id,
+         oem_revision, creator_id, creator_revision) = _ACPI_HDR.unpack_from(self.bios_data, offset)
         
         return ACPITable(
-            signature=signature,
+            signature=signature.decode('ascii', errors='ignore'),
             offset=offset,
             length=length,
             revision=revision,
-            oem_id=oem_id,
-            oem_table_id=oem_table_id,
+            oem_id=oem_id.decode('ascii', errors='ignore').strip('\x00'),
+            oem_table_id=oem_table_id.decode('ascii', errors='ignore').strip('\x00'),
             oem_revision=oem_revision,
-            creator_id=creator_id,
+            creator_id=creator_id.decode('ascii', errors='ignore').strip('\x00'),
             creator_revision=creator_revision
         )
     
@@ -264,8 +290,8 @@ class ACPIPatcher:
         table = tables[index]
         
         try:
-            table_data = bytes(self.bios_data[table.offset:table.offset + table.length])
-            output_path.write_bytes(table_data)
+            with output_path.open('wb') as f:
+                f.write(self._mv[table.offset:table.offset + table.length])
             log.info(f"Extracted {signature} table to {output_path} ({table.length} bytes)")
             return True
         except Exception as e:
@@ -301,28 +327,31 @@ class ACPIPatcher:
         
         for patch in patches:
             applied_count = 0
-            pos = table_start
+            next_pos = table_start
             
-            while pos <= table_end - len(patch.search):
-                if self.bios_data[pos:pos + len(patch.search)] == patch.search:
-                    # Apply patch
-                    if len(patch.replace) != len(patch.search):
-                        log.warning(f"Patch size mismatch for '{patch.description}' - skipping")
-                        break
-                    
-                    self.bios_data[pos:pos + len(patch.replace)] = patch.replace
-                    applied_count += 1
-                    any_applied = True
-                    
-                    log.info(f"Applied patch: {patch.description} at 0x{pos:x}")
-                    
-                    # Check count limit
-                    if patch.count > 0 and applied_count >= patch.count:
-                        break
-                    
-                    pos += len(patch.search)
-                else:
-                    pos += 1
+            # The first write may swap bios_data for a private copy; that is
+            # safe mid-scan since this patch never writes at or past next_pos
+            for pos in find_all(self.bios_data, patch.search, table_start, table_end):
+                # Matches overlapping the previous replacement are skipped
+                if pos < next_pos:
+                    continue
+                
+                # Apply patch
+                if len(patch.replace) != len(patch.search):
+                    log.warning(f"Patch size mismatch for '{patch.description}' - skipping")
+                    break
+                
+                self._writable()[pos:pos + len(patch.replace)] = patch.replace
+                applied_count += 1
+                any_applied = True
+                
+                log.info(f"Applied patch: {patch.description} at 0x{pos:x}")
+                
+                # Check count limit
+                if patch.count > 0 and applied_count >= patch.count:
+                    break
+                
+                next_pos = pos + len(patch.search)
             
             if applied_count == 0:
                 log.warning(f"Patch not applied: {patch.description} (pattern not found)")
@@ -330,6 +359,8 @@ class ACPIPatcher:
         # Recalculate table checksum
         if any_applied:
             self._recalculate_checksum(table)
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(f"Image CRC32 after patching {signature}: 0x{self._bios_fingerprint():08X}")
         
         return any_applied
     
@@ -366,7 +397,7 @@ class ACPIPatcher:
             return False
         
         # Write SSDT
-        self.bios_data[pos:pos + len(ssdt_data)] = ssdt_data
+        self._writable()[pos:pos + len(ssdt_data)] = ssdt_data
         
         log.info(f"Injected SSDT at 0x{pos:x} ({len(ssdt_data)} bytes)")
         log.warning("[WARN] RSDT/XSDT not updated - manual pointer update required")
@@ -382,20 +413,70 @@ class ACPIPatcher:
         Returns:
             Offset or None
         """
+        # Below one block each window is a single early-exit memcmp, which
+        # beats classifying the whole image; NumPy pays off for multi-block
+        # windows, where the scalar scan re-compares nearly-free regions
+        if NUMPY_AVAILABLE and size >= 4096:
+            return self._find_free_space_np(size)
+        
         # Look for contiguous 0xFF or 0x00 blocks
         pos = 0
+        erased = b'\xFF' * size
+        zeroed = bytes(size)
         
         while pos < len(self.bios_data) - size:
-            # Check if this region is free (all 0xFF or all 0x00)
-            chunk = self.bios_data[pos:pos + size]
+            # Check if this region is free (all 0xFF or all 0x00); memoryview
+            # compares are C-level and don't copy the window
+            chunk = self._mv[pos:pos + size]
             
-            if all(b == 0xFF for b in chunk) or all(b == 0x00 for b in chunk):
+            if chunk == erased or chunk == zeroed:
                 return pos
             
             pos += 4096  # Check every 4KB
         
         return None
     
+    def _find_free_space_np(self, size: int, block: int = 4096) -> Optional[int]:
+        """Vectorized _find_free_space: classify every 4KB block in one pass.
+        
+        Args:
+            size: Required size
+            block: Candidate alignment (block size)
+            
+        Returns:
+            Offset or None
+        """
+        arr = np.frombuffer(self.bios_data, dtype=np.uint8)
+        n_blocks = len(arr) // block
+        blocks = arr[:n_blocks * block].reshape(n_blocks, block)
+        full, rem = divmod(size, block)
+        
+        # Candidate start blocks (same bound as the scalar scan: pos < len - size)
+        n_starts = min((len(arr) - size + block - 1) // block, n_blocks - full + 1)
+        if n_starts <= 0:
+            return None
+        
+        # Block holding the partial tail of each candidate; at most the last
+        # one runs past the whole blocks into the image's trailing bytes
+        tail_blocks = np.arange(full, full + n_starts)
+        inside = tail_blocks < n_blocks
+        
+        free = np.zeros(n_starts, dtype=bool)
+        for fill in (0xFF, 0x00):
+            filled = blocks == fill
+            # Sliding count of fully-filled blocks via prefix sums
+            counts = np.concatenate(([0], np.cumsum(filled.all(axis=1))))
+            ok = (counts[full:full + n_starts] - counts[:n_starts]) == full
+            if rem:
+                tail_ok = np.empty(n_starts, dtype=bool)
+                tail_ok[inside] = filled[:, :rem].all(axis=1)[tail_blocks[inside]]
+                tail_ok[~inside] = (arr[n_blocks * block:n_blocks * block + rem] == fill).all()
+                ok &= tail_ok
+            free |= ok
+        
+        hits = np.flatnonzero(free)
+        return int(hits[0]) * block if hits.size else None
+    
     def _recalculate_checksum(self, table: ACPITable) -> None:
         """Recalculate and update table checksum.
         
@@ -406,22 +487,32 @@ class ACPIPatcher:
         checksum_offset = table.offset + 9
         
         # Zero out current checksum
-        self.bios_data[checksum_offset] = 0
+        self._writable()[checksum_offset] = 0
         
-        # Calculate new checksum
-        table_data = self.bios_data[table.offset:table.offset + table.length]
-        checksum = (256 - (sum(table_data) & 0xFF)) & 0xFF
+        # Calculate new checksum (vectorized sum over a zero-copy view)
+        table_data = self._mv[table.offset:table.offset + table.length]
+        checksum = (256 - checksum8(table_data)) & 0xFF
         
         # Write new checksum
-        self.bios_data[checksum_offset] = checksum
+        self._data[checksum_offset] = checksum
     
-    def get_modified_data(self) -> bytes:
+    def _bios_fingerprint(self) -> int:
+        """CRC32 of the current image, for integrity checks and logging.
+        
+        This is not a substitute for the additive ACPI table checksum.
+        """
+        return crc32(self.bios_data)
+    
+    def get_modified_data(self) -> memoryview:
         """Get modified BIOS data with patched tables.
         
+        The view is zero-copy and only valid while this object is alive;
+        wrap it in bytes() to keep a snapshot across further changes.
+        
         Returns:
-            Modified BIOS data
+            Read-only view of the modified BIOS data
         """
-        return bytes(self.bios_data)
+        return self._mv.toreadonly()
     
     def print_tables(self) -> None:
         """Print all found ACPI tables."""
@@ -432,6 +523,7 @@ class ACPIPatcher:
         print("\n" + "="*70)
         print("ACPI TABLES")
         print("="*70)
+        print(f"Image CRC32: 0x{self._bios_fingerprint():08X}")
         
         for sig, tables in sorted(self.tables.items()):
             for i, table in enumerate(tables):
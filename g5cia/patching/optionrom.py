@@ -1,13 +1,44 @@
 """Option ROM management and patching."""
 
+import re
 import struct
 import logging
 from typing import List, Optional, Dict
 from dataclasses import dataclass
 from pathlib import Path
 
+# NumPy is optional; it only accelerates whole-image scans
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
 log = logging.getLogger(__name__)
 
+# Option ROM header: size in 512-byte blocks at 0x02, PCIR pointer at 0x18
+_ROM_HDR = struct.Struct('<2xB21xH')
+
+# PCI Data Structure: signature, vendor ID, device ID, revision + class code at 0x0C
+_PCIR_HDR = struct.Struct('<4sHH4xI')
+
+# ROM type indexed by PCI base class code
+_ROM_TYPE = tuple(
+    {
+        0x01: 'Storage',  # Mass storage controller
+        0x02: 'LAN',      # Network controller
+        0x03: 'VBIOS',    # Display controller
+        0x0C: 'USB',      # Serial bus controller
+    }.get(base_class, 'Other')
+    for base_class in range(256)
+)
+
+# Version string prefixes followed by up to 16 printable chars; a bare 'V'
+# is only a fallback, since stray 'V' bytes would shadow a real version
+_VER_RE = re.compile(rb'(?:Ver |Version )[\x20-\x7e]{1,16}')
+_V_RE = re.compile(rb'V[\x20-\x7e]{1,16}')
+
 
 @dataclass
 class ROMInfo:
@@ -42,11 +73,30 @@ class OptionROMManager:
         """Initialize with BIOS data.
         
         Args:
-            bios_data: Raw BIOS firmware data
+            bios_data: Raw BIOS firmware data (bytes, bytearray or a read-only mmap)
         """
-        self.bios_data = bytearray(bios_data)
+        # Copy-on-write: the source is only copied into a bytearray on the
+        # first write, so callers must not modify a mutable source buffer
+        # after handing it over
+        self._src = bios_data
+        self._data: Optional[bytearray] = None
+        # Zero-copy view for read-only slicing
+        self._mv = memoryview(bios_data).toreadonly()
         self.roms: List[OptionROM] = []
-        
+        self._rom_index: Dict[str, OptionROM] = {}
+    
+    @property
+    def bios_data(self):
+        """Current image contents (the source buffer until the first write)."""
+        return self._data if self._data is not None else self._src
+    
+    def _writable(self) -> bytearray:
+        """Materialize the private bytearray copy on first mutation."""
+        if self._data is None:
+            self._data = bytearray(self._src)
+            self._mv = memoryview(self._data)
+        return self._data
+    
     def list_roms(self) -> List[OptionROM]:
         """Find and list all Option ROMs.
         
@@ -54,29 +104,48 @@ class OptionROMManager:
             List of OptionROM objects
         """
         self.roms = []
-        pos = 0
-        
-        while pos < len(self.bios_data) - 2:
-            # Look for ROM signature (0x55AA)
-            if self.bios_data[pos:pos+2] == self.ROM_SIGNATURE:
-                try:
-                    rom = self._parse_rom(pos)
-                    if rom:
-                        self.roms.append(rom)
-                        log.debug(f"Found {rom.info.rom_type} ROM at 0x{pos:x}: "
-                                f"VID={rom.info.vendor_id:04x}, DID={rom.info.device_id:04x}")
-                        
-                        # Skip to end of this ROM
-                        pos += rom.info.size
-                        continue
-                except Exception as e:
-                    log.debug(f"Error parsing potential ROM at 0x{pos:x}: {e}")
+        self._rom_index.clear()
+        next_pos = 0
+        
+        for pos in self._rom_candidates():
+            # Skip candidates inside a ROM we already parsed
+            if pos < next_pos:
+                continue
             
-            pos += 512  # ROMs are typically 512-byte aligned
+            try:
+                rom = self._parse_rom(pos)
+                if rom:
+                    self.roms.append(rom)
+                    self._rom_index[rom.info.rom_id] = rom
+                    log.debug(f"Found {rom.info.rom_type} ROM at 0x{pos:x}: "
+                            f"VID={rom.info.vendor_id:04x}, DID={rom.info.device_id:04x}")
+                    
+                    # Skip to end of this ROM
+                    next_pos = pos + rom.info.size
+            except Exception as e:
+                log.debug(f"Error parsing potential ROM at 0x{pos:x}: {e}")
         
         log.info(f"Found {len(self.roms)} Option ROMs")
         return self.roms
     
+    def _rom_candidates(self) -> List[int]:
+        """Offsets of every 512-byte aligned 0x55AA ROM signature.
+        
+        Returns:
+            Sorted list of candidate offsets
+        """
+        # ROMs are typically 512-byte aligned
+        end = len(self.bios_data) - 2
+        
+        if NUMPY_AVAILABLE:
+            arr = np.frombuffer(self.bios_data, dtype=np.uint8)
+            starts = np.arange(0, max(end, 0), 512)
+            mask = (arr[starts] == 0x55) & (arr[starts + 1] == 0xAA)
+            return starts[mask].tolist()
+        
+        return [pos for pos in range(0, end, 512)
+                if self._mv[pos:pos+2] == self.ROM_SIGNATURE]
+    
     def _parse_rom(self, offset: int) -> Optional[OptionROM]:
         """Parse Option ROM at offset.
         
@@ -89,37 +158,25 @@ class OptionROMManager:
         if offset + 0x1A >= len(self.bios_data):
             return None
         
-        # Read ROM header
-        # Offset 0x00-0x01: Signature (0x55AA)
-        # Offset 0x02: ROM size in 512-byte blocks
-        # Offset 0x18-0x19: PCI Data Structure pointer
-        
-        rom_size_blocks = self.bios_data[offset + 0x02]
+        # Read ROM header (size in 512-byte blocks, PCI Data Structure pointer)
+        rom_size_blocks, pcir_offset = _ROM_HDR.unpack_from(self.bios_data, offset)
         rom_size = rom_size_blocks * 512
         
         if rom_size == 0 or rom_size > 1024 * 1024:  # Max 1MB
             return None
         
-        # Get PCI Data Structure offset
-        pcir_offset = struct.unpack('<H', self.bios_data[offset + 0x18:offset + 0x1A])[0]
-        
         if pcir_offset == 0 or offset + pcir_offset + 24 >= len(self.bios_data):
             return None
         
         # Parse PCI Data Structure
         pcir_pos = offset + pcir_offset
+        signature, vendor_id, device_id, class_rev = _PCIR_HDR.unpack_from(self.bios_data, pcir_pos)
         
-        # Check PCIR signature
-        if self.bios_data[pcir_pos:pcir_pos + 4] != self.PCIR_SIGNATURE:
+        if signature != self.PCIR_SIGNATURE:
             return None
         
-        # Read vendor/device IDs
-        vendor_id = struct.unpack('<H', self.bios_data[pcir_pos + 4:pcir_pos + 6])[0]
-        device_id = struct.unpack('<H', self.bios_data[pcir_pos + 6:pcir_pos + 8])[0]
-        
-        # Read class code to determine ROM type
-        class_code = struct.unpack('<I', 
-            self.bios_data[pcir_pos + 13:pcir_pos + 16] + b'\x00')[0]
+        # Class code is the 24 bits above the revision byte
+        class_code = class_rev >> 8
         
         rom_type = self._classify_rom(class_code, vendor_id, device_id)
         
@@ -127,21 +184,10 @@ class OptionROMManager:
         rom_id = f"{rom_type}_{vendor_id:04x}_{device_id:04x}_{offset:08x}"
         
         # Extract version (basic heuristic)
-        version = "Unknown"
-        try:
-            # Look for version strings in first 256 bytes
-            rom_header = self.bios_data[offset:offset + min(256, rom_size)]
-            
-            # Common version patterns
-            for pattern in [b'Ver ', b'Version ', b'V']:
-                idx = rom_header.find(pattern)
-                if idx != -1:
-                    # Extract up to 16 chars after pattern
-                    ver_data = rom_header[idx:idx + 20]
-                    version = ver_data.decode('ascii', errors='ignore').strip()
-                    break
-        except:
-            pass
+        # Look for a version string in the first 256 bytes
+        rom_header = self._mv[offset:offset + min(256, rom_size)]
+        m = _VER_RE.search(rom_header) or _V_RE.search(rom_header)
+        version = m.group(0).decode('ascii', errors='ignore').strip() if m else "Unknown"
         
         # Create ROM info
         info = ROMInfo(
@@ -156,7 +202,7 @@ class OptionROMManager:
         )
         
         # Extract ROM data
-        rom_data = bytes(self.bios_data[offset:offset + rom_size])
+        rom_data = bytes(self._mv[offset:offset + rom_size])
         
         return OptionROM(info=info, data=rom_data)
     
@@ -171,21 +217,11 @@ class OptionROMManager:
         Returns:
             ROM type string
         """
-        # PCI Base Class codes
-        base_class = (class_code >> 16) & 0xFF
-        
-        if base_class == 0x03:  # Display controller
-            return 'VBIOS'
-        elif base_class == 0x02:  # Network controller
-            return 'LAN'
-        elif base_class == 0x01:  # Mass storage controller
-            if ((class_code >> 8) & 0xFF) == 0x04:  # RAID
-                return 'RAID'
-            return 'Storage'
-        elif base_class == 0x0C:  # Serial bus controller
-            return 'USB'
-        else:
-            return 'Other'
+        rom_type = _ROM_TYPE[(class_code >> 16) & 0xFF]
+        
+        if rom_type == 'Storage' and ((class_code >> 8) & 0xFF) == 0x04:  # RAID
+            return 'RAID'
+        return rom_type
     
     def extract_rom(self, rom_id: str, output_path: Path) -> bool:
         """Extract an Option ROM to file.
@@ -251,16 +287,18 @@ class OptionROMManager:
         # Replace ROM data
         offset = rom.info.offset
         
+        data = self._writable()
+        
         # Clear old ROM area
-        self.bios_data[offset:offset + rom.info.size] = b'\xFF' * rom.info.size
+        data[offset:offset + rom.info.size] = b'\xFF' * rom.info.size
         
         # Write new ROM
-        self.bios_data[offset:offset + len(new_rom_data)] = new_rom_data
+        data[offset:offset + len(new_rom_data)] = new_rom_data
         
         # Pad with 0xFF if smaller
         if len(new_rom_data) < rom.info.size:
             pad_size = rom.info.size - len(new_rom_data)
-            self.bios_data[offset + len(new_rom_data):offset + rom.info.size] = b'\xFF' * pad_size
+            data[offset + len(new_rom_data):offset + rom.info.size] = b'\xFF' * pad_size
         
         log.info(f"Updated {rom.info.rom_type} ROM at 0x{offset:x}")
         return True
@@ -286,18 +324,18 @@ class OptionROMManager:
         Returns:
             OptionROM or None
         """
-        for rom in self.roms:
-            if rom.info.rom_id == rom_id:
-                return rom
-        return None
+        return self._rom_index.get(rom_id)
     
-    def get_modified_data(self) -> bytes:
+    def get_modified_data(self) -> memoryview:
         """Get modified BIOS data with updated ROMs.
         
+        The view is zero-copy and only valid while this object is alive;
+        wrap it in bytes() to keep a snapshot across further changes.
+        
         Returns:
-            Modified BIOS data
+            Read-only view of the modified BIOS data
         """
-        return bytes(self.bios_data)
+        return self._mv.toreadonly()
     
     def print_roms(self) -> None:
         """Print all found ROMs."""
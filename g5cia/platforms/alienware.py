@@ -12,12 +12,12 @@ ALIENWARE_AURORA_R10 = PlatformInfo(
     
     # Supported CPUIDs (AMD Ryzen 3000/5000 series)
     # Note: AMD uses different CPUID format
-    supported_cpuids=[
+    supported_cpuids=(
         0x870F10,  # Ryzen 9 5950X/5900X
         0x870F00,  # Ryzen 7 5800X
         0x830F10,  # Ryzen 9 3950X/3900X
         0x830F00,  # Ryzen 7 3800X/3700X
-    ],
+    ),
     
     # VRM limits (Aurora R10 has robust VRM for high-end Ryzen)
     vrm_sustained=140,
@@ -39,16 +39,16 @@ ALIENWARE_AURORA_R10 = PlatformInfo(
     },
     
     # Known BIOS versions
-    bios_versions=[
+    bios_versions=(
         '1.0.0', '1.0.1', '1.0.2', '1.0.3', '1.0.4',
-    ],
+    ),
     
     # Detection signatures
-    signatures=[
+    signatures=(
         b'Alienware\x00',
         b'Aurora R10\x00',
         b'Dell Inc.\x00Alienware',
-    ],
+    ),
     
     # Feature support
     supports_rebar=True,
@@ -11,12 +11,12 @@ DELL_G5_5000 = PlatformInfo(
     pch="B560/H570",  # 11th gen chipsets
     
     # Supported CPUIDs (11th gen Intel Core - Rocket Lake)
-    supported_cpuids=[
+    supported_cpuids=(
         0xA0671,  # i9-11900
         0xA0670,  # i7-11700
         0xA0672,  # i5-11600/11400
         0xA0673,  # i3-11320
-    ],
+    ),
     
     # VRM limits (slightly better VRM than 5090)
     vrm_sustained=105,
@@ -44,16 +44,18 @@ DELL_G5_5000 = PlatformInfo(
     },
     
     # Known BIOS versions (placeholder)
-    bios_versions=[
+    bios_versions=(
         '1.0.0', '1.1.0', '1.2.0',
-    ],
+    ),
     
     # Detection signatures
-    signatures=[
-        b'Dell Inc.\x00',
+    signatures=(
         b'G5 5000\x00',
         b'Inspiron 5000\x00',
-    ],
+    ),
+    vendor_signatures=(
+        b'Dell Inc.\x00',  # Vendor hint only; too generic to match alone
+    ),
     
     # Feature support (11th gen has better support)
     supports_rebar=True,
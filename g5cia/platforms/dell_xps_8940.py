@@ -11,12 +11,12 @@ DELL_XPS_8940 = PlatformInfo(
     pch="Z490/Z590",  # Enthusiast chipsets
     
     # Supported CPUIDs (10th/11th gen Intel Core)
-    supported_cpuids=[
+    supported_cpuids=(
         0xA0655,  # i9-10900K (10th gen)
         0xA0653,  # i7-10700K
         0xA0671,  # i9-11900K (11th gen)
         0xA0670,  # i7-11700K
-    ],
+    ),
     
     # VRM limits (better VRM for K-series CPUs)
     vrm_sustained=125,
@@ -49,15 +49,17 @@ DELL_XPS_8940 = PlatformInfo(
     },
     
     # Known BIOS versions (placeholder)
-    bios_versions=[
+    bios_versions=(
         '2.0.0', '2.1.0', '2.2.0', '2.3.0',
-    ],
+    ),
     
     # Detection signatures
-    signatures=[
-        b'Dell Inc.\x00',
+    signatures=(
         b'XPS 8940\x00',
-    ],
+    ),
+    vendor_signatures=(
+        b'Dell Inc.\x00',  # Vendor hint only; too generic to match alone
+    ),
     
     # Feature support (Z-series chipset has full support)
     supports_rebar=True,
@@ -1,12 +1,17 @@
 """ReBAR (Resizable BAR) driver injection."""
 
 import logging
+import mmap
+import os
+import shutil
 import struct
 from typing import Optional
 from pathlib import Path
 import urllib.request
 
 from .image import ImageParser, FirmwareVolume
+from .patcher import Patcher
+from .security import SecurityAnalyzer
 from .utils import checksum8, guid_to_str
 
 log = logging.getLogger(__name__)
@@ -15,6 +20,29 @@ log = logging.getLogger(__name__)
 REBAR_DRIVER_URL = "https://github.com/xCuri0/ReBarUEFI/raw/main/NvStrapsReBar/NvStrapsReBar.ffs"
 REBAR_DRIVER_GUID = "9E8EEE1E-BE0D-4AC9-BA7F-2B9C8F856A96"
 
+# FFS file header: GUID, integrity check, type, attributes, 24-bit size + state
+_FFS_HDR = struct.Struct('<16sHBBI')
+
+
+def _read_body(response) -> bytes:
+    """Read an HTTP response body straight into a buffer sized from Content-Length."""
+    length = int(response.headers.get('Content-Length') or 0)
+    if length <= 0:
+        return response.read()
+    
+    buf = bytearray(length)
+    with memoryview(buf) as view:
+        pos = 0
+        while pos < length:
+            n = response.readinto(view[pos:])
+            if not n:
+                break
+            pos += n
+    
+    # A short body is kept as-is; _validate_driver rejects it by size
+    del buf[pos:]
+    return buf
+
 
 class ReBarInjector:
     """ReBAR driver injection handler."""
@@ -22,6 +50,7 @@ class ReBarInjector:
     def __init__(self, parser: ImageParser):
         self.parser = parser
         self.driver_data: Optional[bytes] = None
+        self._validated = False
     
     def download_driver(self, local_path: Optional[str] = None) -> bool:
         """Download NvStrapsReBar.ffs driver.
@@ -39,12 +68,13 @@ class ReBarInjector:
             log.info(f"Downloading ReBAR driver from {REBAR_DRIVER_URL}")
             try:
                 with urllib.request.urlopen(REBAR_DRIVER_URL, timeout=30) as response:
-                    self.driver_data = response.read()
+                    self.driver_data = _read_body(response)
             except Exception as e:
                 log.error(f"Failed to download ReBAR driver: {e}")
                 return False
         
         # Validate FFS structure
+        self._validated = False
         if not self._validate_driver():
             log.error("ReBAR driver validation failed")
             self.driver_data = None
@@ -54,30 +84,33 @@ class ReBarInjector:
         return True
     
     def _validate_driver(self) -> bool:
-        """Validate FFS structure of driver."""
+        """Validate FFS structure of driver.
+        
+        The result is cached until download_driver() loads new data.
+        """
+        if self._validated:
+            return True
+        
         if not self.driver_data or len(self.driver_data) < 0x18:
             return False
         
-        # Check GUID
-        guid_bytes = self.driver_data[0:16]
-        guid = guid_to_str(guid_bytes)
+        guid_bytes, _, file_type, _, size_state = _FFS_HDR.unpack_from(self.driver_data)
+        file_size = size_state & 0xFFFFFF
         
         # Verify it looks like a valid FFS file
         # Check file type (should be DRIVER = 0x07)
-        file_type = self.driver_data[0x12]
-        
         if file_type != 0x07:
             log.warning(f"Unexpected file type: 0x{file_type:02X} (expected 0x07)")
         
         # Check size
-        size_bytes = self.driver_data[0x14:0x17] + b'\x00'
-        file_size = struct.unpack('<I', size_bytes)[0]
-        
         if file_size != len(self.driver_data):
             log.error(f"Size mismatch: header says {file_size}, actual {len(self.driver_data)}")
             return False
         
-        log.debug(f"ReBAR driver GUID: {guid}, type: 0x{file_type:02X}, size: {file_size}")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"ReBAR driver GUID: {guid_to_str(guid_bytes)}, type: 0x{file_type:02X}, size: {file_size}")
+        
+        self._validated = True
         return True
     
     def inject(self, data: bytearray, force: bool = False) -> bool:
@@ -94,9 +127,8 @@ class ReBarInjector:
             log.error("ReBAR driver not loaded - call download_driver() first")
             return False
         
-        # Check for Boot Guard
-        from .security import SecurityAnalyzer
-        analyzer = SecurityAnalyzer(bytes(data))
+        # Check for Boot Guard (read-only scan of the buffer, no copy)
+        analyzer = SecurityAnalyzer(data)
         status = analyzer.analyze()
         
         if status.boot_guard_verified and not force:
@@ -122,14 +154,14 @@ class ReBarInjector:
         
         log.info(f"Injecting ReBAR driver at 0x{free_offset:x}")
         
-        # Inject driver
-        data[free_offset:free_offset+len(self.driver_data)] = self.driver_data
-        
-        # Recalculate volume checksum
-        from .patcher import Patcher
-        patcher = Patcher(bytes(data))
-        patcher.data = data  # Use same bytearray
-        patcher.recalc_fv_checksum(dxe_vol.offset)
+        # Inject driver and fix up the volume checksum through one view of
+        # the caller's buffer (memcpy slice assignment, no intermediate copies)
+        with memoryview(data) as mv:
+            mv[free_offset:free_offset+len(self.driver_data)] = self.driver_data
+            
+            patcher = Patcher(mv, in_place=True)
+            patcher.recalc_fv_checksum(dxe_vol.offset)
+            del patcher  # Drop its derived views before mv is released
         
         log.info("[OK] ReBAR driver injected successfully")
         return True
@@ -151,28 +183,44 @@ def inject_rebar_driver(image_path: str, output_path: str,
     """
     log.info(f"ReBAR injection: {image_path} -> {output_path}")
     
-    # Load image
-    data = Path(image_path).read_bytes()
-    parser = ImageParser(data)
-    
-    if not parser.parse():
-        log.error("Failed to parse firmware image")
+    if os.path.getsize(image_path) == 0:
+        log.error(f"Image is empty: {image_path}")
         return False
     
-    # Create injector
-    injector = ReBarInjector(parser)
-    
-    # Download/load driver
-    if not injector.download_driver(driver_path):
-        return False
+    # Inject into a mapped copy of the image so parser and injector share
+    # pages and only the pages the injection touches are dirtied. The copy
+    # sits next to the output and only replaces it once injection succeeds
+    temp_path = output_path + '.tmp'
+    shutil.copyfile(image_path, temp_path)
     
-    # Inject
-    data_array = bytearray(data)
-    if not injector.inject(data_array, force):
-        return False
+    ok = False
+    try:
+        with open(temp_path, 'r+b') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE) as data:
+            parser = ImageParser(data)
+            
+            if not parser.parse():
+                log.error("Failed to parse firmware image")
+                return False
+            
+            # Create injector
+            injector = ReBarInjector(parser)
+            
+            # Download/load driver
+            if not injector.download_driver(driver_path):
+                return False
+            
+            # Inject
+            if not injector.inject(data, force):
+                return False
+            
+            data.flush()
+        
+        os.replace(temp_path, output_path)
+        ok = True
+    finally:
+        # Leave any existing output untouched on failure
+        if not ok:
+            Path(temp_path).unlink(missing_ok=True)
     
-    # Save
-    Path(output_path).write_bytes(data_array)
     log.info(f"Modded image saved to {output_path}")
-    
     return True
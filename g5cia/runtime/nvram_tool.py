@@ -1,16 +1,46 @@
 """NVRAM unlock tool for instant unlock without BIOS reflash."""
 
 import logging
-from typing import List, Tuple, Optional
+from functools import cache
+from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 
 from ..nvram import NVRAMAccess
-from ..offsets import get_offset
+from ..offsets import get_offset_or_none
 from ..firmware.ifr import IFRParser
 
 log = logging.getLogger(__name__)
 
 
+def _read_int(buf: bytearray, offset: int, size: int) -> int:
+    """Read a little-endian setting value; 1-byte flags skip int.from_bytes."""
+    if size == 1:
+        return buf[offset]
+    return int.from_bytes(buf[offset:offset + size], 'little')
+
+
+def _write_int(buf: bytearray, offset: int, size: int, value: int) -> None:
+    """Write a little-endian setting value; 1-byte flags skip int.to_bytes."""
+    if size == 1:
+        buf[offset] = value
+    else:
+        buf[offset:offset + size] = value.to_bytes(size, 'little')
+
+
+@cache
+def _default_backup_path() -> Path:
+    """Default Setup backup location, resolved once (lazily, in case HOME is unset at import)."""
+    return Path.home() / '.g5cia_setup_backup.bin'
+
+
+# Result messages per target value: (already set, dry run, applied)
+_PLAN_MESSAGES = {
+    0: ('Already unlocked', '[DRY] Would unlock @0x{offset:X} (current={current})',
+        'Unlocked @0x{offset:X} (was {current})'),
+    1: ('Already locked', '[DRY] Would lock @0x{offset:X}', 'Locked @0x{offset:X}'),
+}
+
+
 class NVRAMUnlocker:
     """Unlock BIOS settings via NVRAM without reflashing."""
     
@@ -35,6 +65,9 @@ class NVRAMUnlocker:
         self.use_ifr_parser = use_ifr_parser
         self.ifr_parser: Optional[IFRParser] = None
         self.setup_data: Optional[bytes] = None
+        # Setup contents the IFR parser last ran on, and offsets resolved from it
+        self._parsed_setup: Optional[bytes] = None
+        self._resolved: Dict[str, Optional[Tuple[int, int]]] = {}
         
     def _load_setup(self) -> bool:
         """Load current Setup variable from NVRAM."""
@@ -61,6 +94,13 @@ class NVRAMUnlocker:
             log.error("Setup data not loaded")
             return False
         
+        # Reuse the previous parse and resolved offsets while Setup is unchanged
+        if self.setup_data == self._parsed_setup:
+            return True
+        
+        self._parsed_setup = self.setup_data
+        self._resolved.clear()
+        
         try:
             self.ifr_parser = IFRParser()
             offsets = self.ifr_parser.parse(self.setup_data)
@@ -95,13 +135,76 @@ class NVRAMUnlocker:
                 return (offset_info.offset, offset_info.size)
         
         # Fall back to static offsets
-        try:
-            offset, size = get_offset(setting_name)
-            log.debug(f"Found {setting_name} via static offsets: 0x{offset:x}")
-            return (offset, size)
-        except KeyError:
+        loc = get_offset_or_none(setting_name)
+        if loc is None:
             log.warning(f"Setting {setting_name} not found in static offsets")
             return None
+        
+        log.debug(f"Found {setting_name} via static offsets: 0x{loc[0]:x}")
+        return loc
+    
+    def _resolve(self, setting_name: str) -> Optional[Tuple[int, int]]:
+        """Cached _get_offset, valid until the IFR parser sees new Setup data."""
+        if setting_name not in self._resolved:
+            self._resolved[setting_name] = self._get_offset(setting_name)
+        return self._resolved[setting_name]
+    
+    def _apply_plan(self, settings: List[Tuple[str, str]], value: int,
+                    dry: bool) -> Tuple[List[Tuple[str, bool, str]], Optional[bytearray], List[Tuple[int, int]]]:
+        """Set each (setting_name, description) in Setup to value (0 = unlock, 1 = lock).
+        
+        Current values are read from the loaded Setup without copying it;
+        the modified copy is only allocated on the first real change.
+        
+        Returns:
+            Tuple of (results, modified Setup or None, (offset, size) of every write)
+        """
+        already, dry_msg, done_msg = _PLAN_MESSAGES[value]
+        results: List[Tuple[str, bool, str]] = []
+        modified: Optional[bytearray] = None
+        changed: List[Tuple[int, int]] = []
+        
+        with memoryview(self.setup_data) as view:
+            for setting_name, description in settings:
+                try:
+                    offset_info = self._resolve(setting_name)
+                    
+                    if not offset_info:
+                        results.append((description, False, 'Offset not found'))
+                        continue
+                    
+                    offset, size = offset_info
+                    buf = view if modified is None else modified
+                    
+                    if offset >= len(buf):
+                        results.append((description, False, f'Offset 0x{offset:x} beyond Setup size'))
+                        continue
+                    
+                    # Read current value
+                    current_val = _read_int(buf, offset, size)
+                    
+                    if current_val == value:
+                        results.append((description, True, already))
+                        continue
+                    
+                    if dry:
+                        results.append((description, True, dry_msg.format(offset=offset, current=current_val)))
+                        continue
+                    
+                    if modified is None:
+                        modified = bytearray(self.setup_data)
+                    _write_int(modified, offset, size, value)
+                    
+                    changed.append((offset, size))
+                    msg = done_msg.format(offset=offset, current=current_val)
+                    results.append((description, True, msg))
+                    log.info(f"{description}: {msg}")
+                
+                except Exception as e:
+                    results.append((description, False, f'Error: {e}'))
+                    log.error(f"Error applying {setting_name}: {e}")
+        
+        return results, modified, changed
     
     def nv_unlock(self, dry: bool = False) -> List[Tuple[str, bool, str]]:
         """Unlock CFG/OC/PL locks via NVRAM without reflashing.
@@ -112,8 +215,6 @@ class NVRAMUnlocker:
         Returns:
             List of tuples: (setting_name, success, message)
         """
-        results = []
-        
         # Load current Setup
         if not self._load_setup():
             return [('NVRAM Access', False, 'Failed to load Setup variable')]
@@ -124,7 +225,7 @@ class NVRAMUnlocker:
         
         # Create backup
         if not dry:
-            backup_path = Path.home() / '.g5cia_setup_backup.bin'
+            backup_path = _default_backup_path()
             try:
                 backup_path.write_bytes(self.setup_data)
                 log.info(f"Created backup at {backup_path}")
@@ -132,64 +233,18 @@ class NVRAMUnlocker:
                 log.warning(f"Failed to create backup: {e}")
         
         # Unlock each setting
-        setup_modified = False
-        modified_data = bytearray(self.setup_data)
-        
-        for setting_name, description in self.LOCK_SETTINGS:
-            try:
-                offset_info = self._get_offset(setting_name)
-                
-                if not offset_info:
-                    results.append((description, False, f'Offset not found'))
-                    continue
-                
-                offset, size = offset_info
-                
-                if offset >= len(modified_data):
-                    results.append((description, False, f'Offset 0x{offset:x} beyond Setup size'))
-                    continue
-                
-                # Read current value
-                if size == 1:
-                    current_val = modified_data[offset]
-                elif size == 2:
-                    current_val = int.from_bytes(modified_data[offset:offset+2], 'little')
-                else:
-                    current_val = int.from_bytes(modified_data[offset:offset+size], 'little')
-                
-                # Check if already unlocked
-                if current_val == 0:
-                    results.append((description, True, f'Already unlocked'))
-                    continue
-                
-                if dry:
-                    results.append((description, True, f'[DRY] Would unlock @0x{offset:X} (current={current_val})'))
-                else:
-                    # Set to 0 (unlocked)
-                    if size == 1:
-                        modified_data[offset] = 0
-                    elif size == 2:
-                        modified_data[offset:offset+2] = (0).to_bytes(2, 'little')
-                    else:
-                        modified_data[offset:offset+size] = (0).to_bytes(size, 'little')
-                    
-                    setup_modified = True
-                    results.append((description, True, f'Unlocked @0x{offset:X} (was {current_val})'))
-                    log.info(f"Unlocked {description} @ 0x{offset:x}")
-            
-            except Exception as e:
-                results.append((description, False, f'Error: {e}'))
-                log.error(f"Error unlocking {setting_name}: {e}")
+        results, modified_data, changed = self._apply_plan(self.LOCK_SETTINGS, 0, dry)
         
         # Write modified Setup back to NVRAM
-        if setup_modified and not dry:
+        if changed and not dry:
             log.info("Writing modified Setup to NVRAM...")
             
             if self.nvram.write_variable("Setup", self.SETUP_GUID, bytes(modified_data)):
-                # Verify by reading back
+                # Verify by reading back; only the flags we wrote need comparing
                 verify_data = self.nvram.read_variable("Setup", self.SETUP_GUID)
                 
-                if verify_data and verify_data == bytes(modified_data):
+                if verify_data and all(verify_data[o:o + n] == modified_data[o:o + n]
+                                       for o, n in changed):
                     log.info("[OK] NVRAM unlock successful and verified")
                     results.append(('Verification', True, 'Write verified successfully'))
                 else:
@@ -211,8 +266,6 @@ class NVRAMUnlocker:
         Returns:
             List of tuples: (setting_name, success, message)
         """
-        results = []
-        
         if not self._load_setup():
             return [('NVRAM Access', False, 'Failed to load Setup variable')]
         
@@ -225,51 +278,10 @@ class NVRAMUnlocker:
         else:
             lock_list = [(s, s) for s in settings]
         
-        setup_modified = False
-        modified_data = bytearray(self.setup_data)
-        
-        for setting_name, description in lock_list:
-            try:
-                offset_info = self._get_offset(setting_name)
-                
-                if not offset_info:
-                    results.append((description, False, 'Offset not found'))
-                    continue
-                
-                offset, size = offset_info
-                
-                if offset >= len(modified_data):
-                    results.append((description, False, f'Offset 0x{offset:x} beyond Setup size'))
-                    continue
-                
-                # Read current value
-                if size == 1:
-                    current_val = modified_data[offset]
-                else:
-                    current_val = int.from_bytes(modified_data[offset:offset+size], 'little')
-                
-                # Check if already locked
-                if current_val == 1:
-                    results.append((description, True, 'Already locked'))
-                    continue
-                
-                if dry:
-                    results.append((description, True, f'[DRY] Would lock @0x{offset:X}'))
-                else:
-                    # Set to 1 (locked)
-                    if size == 1:
-                        modified_data[offset] = 1
-                    else:
-                        modified_data[offset:offset+size] = (1).to_bytes(size, 'little')
-                    
-                    setup_modified = True
-                    results.append((description, True, f'Locked @0x{offset:X}'))
-            
-            except Exception as e:
-                results.append((description, False, f'Error: {e}'))
+        results, modified_data, changed = self._apply_plan(lock_list, 1, dry)
         
         # Write back if modified
-        if setup_modified and not dry:
+        if changed and not dry:
             if self.nvram.write_variable("Setup", self.SETUP_GUID, bytes(modified_data)):
                 results.append(('NVRAM Write', True, 'Successfully written'))
             else:
@@ -287,15 +299,18 @@ class NVRAMUnlocker:
             True if successful
         """
         if backup_path is None:
-            backup_path = Path.home() / '.g5cia_setup_backup.bin'
+            backup_path = _default_backup_path()
         
-        if not backup_path.exists():
+        try:
+            backup_data = backup_path.read_bytes()
+        except FileNotFoundError:
             log.error(f"Backup file not found: {backup_path}")
             return False
+        except OSError as e:
+            log.error(f"Error restoring backup: {e}")
+            return False
         
         try:
-            backup_data = backup_path.read_bytes()
-            
             if self.nvram.write_variable("Setup", self.SETUP_GUID, backup_data):
                 log.info(f"[OK] Restored Setup from {backup_path}")
                 return True
@@ -1,12 +1,32 @@
 """Security analysis for Boot Guard, ME, and lock bits."""
 
+import mmap
+import os
+import re
 import struct
 import logging
-from typing import Optional, List, Tuple
+from typing import Iterator, Optional, List, Tuple, Union
 from dataclasses import dataclass
+from pathlib import Path
+
+# NumPy is optional; it only vectorizes the microcode header scan
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
 
 log = logging.getLogger(__name__)
 
+_ME_SIG_RE = re.compile(rb'\$MN2|\$MAN|\$FPT')
+
+_U32 = struct.Struct('<I')
+_MN2_VERSION = struct.Struct('<4H')  # major, minor, hotfix, build
+
+# Flash Descriptor signature 0x0FF0A55A, little-endian
+_FD_SIG = b'\x5A\xA5\xF0\x0F'
+
 
 @dataclass
 class SecurityStatus:
@@ -31,27 +51,60 @@ class SecurityStatus:
 class SecurityAnalyzer:
     """Analyze firmware security features."""
     
-    def __init__(self, data: bytes):
+    def __init__(self, data: Union[bytes, bytearray, mmap.mmap]):
+        # Only read through find(), regex scans and unpack_from, none of
+        # which copy, so a caller's bytearray or mmap is scanned in place
         self.data = data
         self.status = SecurityStatus()
     
-    def analyze(self) -> SecurityStatus:
-        """Run all security checks."""
+    def _find(self, sig: bytes) -> int:
+        """Offset of the first occurrence of a signature, or -1."""
+        # Explicit start: mmap.find otherwise begins at the file position
+        return self.data.find(sig, 0)
+    
+    def analyze(self, quick: bool = False) -> SecurityStatus:
+        """Run all security checks.
+        
+        Args:
+            quick: Stop as soon as the image is known to be unsafe to flash.
+                The verdict is the same, but the remaining status fields
+                and warnings may be incomplete.
+        
+        Returns:
+            Security status
+        """
         log.info("Running security analysis...")
         
-        self._check_boot_guard()
-        self._check_me_region()
-        self._check_pfat()
-        self._check_fd_lock()
+        if quick:
+            # Cheapest hard-fail check first
+            self._check_pfat()
+            if not self.status.pfat_present:
+                self._check_boot_guard(quick=True)
+            if not self._unsafe():
+                self._check_me_region()
+                self._check_fd_lock()
+        else:
+            self._check_boot_guard()
+            self._check_me_region()
+            self._check_pfat()
+            self._check_fd_lock()
         self._determine_safety()
         
         return self.status
     
-    def _check_boot_guard(self) -> None:
-        """Check for Boot Guard enforcement."""
+    def _unsafe(self) -> bool:
+        """Whether a hard-fail condition has already been found."""
+        return self.status.boot_guard_verified or self.status.pfat_present
+    
+    def _check_boot_guard(self, quick: bool = False) -> None:
+        """Check for Boot Guard enforcement.
+        
+        Args:
+            quick: Skip the remaining scans once Verified Boot is confirmed
+        """
         # Look for KEYM (Boot Guard Key Manifest)
         keym_sig = b'__KEYM__'
-        keym_found = self.data.find(keym_sig)
+        keym_found = self._find(keym_sig)
         
         if keym_found != -1:
             log.info(f"Boot Guard KEYM found at 0x{keym_found:x}")
@@ -61,7 +114,7 @@ class SecurityAnalyzer:
             if keym_found + 0x20 < len(self.data):
                 # Policy is typically at offset 0x10 in KEYM
                 policy_offset = keym_found + 0x10
-                policy = struct.unpack('<I', self.data[policy_offset:policy_offset+4])[0]
+                policy = _U32.unpack_from(self.data, policy_offset)[0]
                 self.status.boot_guard_policy = policy
                 
                 # Bit 0: Verified boot
@@ -73,15 +126,18 @@ class SecurityAnalyzer:
                     self.status.boot_guard_measured = True
                     self.status.warnings.append("WARNING: Boot Guard Measured Boot is enabled")
         
+        if quick and self.status.boot_guard_verified:
+            return
+        
         # Look for BTGP (Boot Guard Policy)
         btgp_sig = b'__BTGP__'
-        if self.data.find(btgp_sig) != -1:
+        if self._find(btgp_sig) != -1:
             log.info("Boot Guard BTGP found")
             self.status.boot_guard_enabled = True
         
         # Look for ACM (Authenticated Code Module)
         acm_sig = b'ACMR'  # ACM header signature
-        acm_found = self.data.find(acm_sig)
+        acm_found = self._find(acm_sig)
         if acm_found != -1:
             log.info(f"ACM found at 0x{acm_found:x}")
             self.status.acm_present = True
@@ -92,7 +148,7 @@ class SecurityAnalyzer:
             b'BootGuardDxe',
         ]
         for pattern in hashdxe_patterns:
-            if pattern in self.data:
+            if self._find(pattern) != -1:
                 log.warning(f"Boot Guard enforcement module found: {pattern.decode('ascii', errors='ignore')}")
                 self.status.warnings.append(f"CRITICAL: Boot Guard HashDXE found - DO NOT flash modified BIOS!")
     
@@ -105,25 +161,26 @@ class SecurityAnalyzer:
             b'$FPT',  # Flash Partition Table
         ]
         
+        # All three share the '$' lead byte that the regex engine skips
+        # to in C, so one alternation pass beats three finds
+        found = {}
+        for match in _ME_SIG_RE.finditer(self.data):
+            found.setdefault(match.group(), match.start())
+            if me_sigs[0] in found:
+                break
+        
         for sig in me_sigs:
-            pos = self.data.find(sig)
+            pos = found.get(sig, -1)
             if pos != -1:
                 log.info(f"ME region signature {sig} found at 0x{pos:x}")
                 self.status.me_region_found = True
                 
-                # Try to parse version
+                # Parse version; the bounds check covers all four words
                 if sig == b'$MN2' and pos + 0x20 < len(self.data):
-                    try:
-                        # Version is typically at offset 0x18
-                        ver_offset = pos + 0x18
-                        major = struct.unpack('<H', self.data[ver_offset:ver_offset+2])[0]
-                        minor = struct.unpack('<H', self.data[ver_offset+2:ver_offset+4])[0]
-                        hotfix = struct.unpack('<H', self.data[ver_offset+4:ver_offset+6])[0]
-                        build = struct.unpack('<H', self.data[ver_offset+6:ver_offset+8])[0]
-                        self.status.me_version = f"{major}.{minor}.{hotfix}.{build}"
-                        log.info(f"ME version: {self.status.me_version}")
-                    except:
-                        pass
+                    # Version is typically at offset 0x18
+                    major, minor, hotfix, build = _MN2_VERSION.unpack_from(self.data, pos + 0x18)
+                    self.status.me_version = f"{major}.{minor}.{hotfix}.{build}"
+                    log.info(f"ME version: {self.status.me_version}")
                 
                 break
     
@@ -131,7 +188,7 @@ class SecurityAnalyzer:
         """Check for PFAT (Platform Flash Armoring Technology)."""
         # PFAT signature
         pfat_sig = b'_PFAT_'
-        pfat_found = self.data.find(pfat_sig)
+        pfat_found = self._find(pfat_sig)
         
         if pfat_found != -1:
             log.warning(f"PFAT found at 0x{pfat_found:x}")
@@ -140,16 +197,18 @@ class SecurityAnalyzer:
     
     def _check_fd_lock(self) -> None:
         """Check for Flash Descriptor lock."""
-        # Flash Descriptor starts with signature 0x0FF0A55A
-        fd_sig = struct.pack('<I', 0x0FF0A55A)
-        fd_pos = self.data.find(fd_sig)
+        # The descriptor signature sits at 0x0, 0x10 or 0x1000 in SPI dumps,
+        # so look in the first 4 KB before falling back to a whole-image search
+        fd_pos = self.data.find(_FD_SIG, 0, 0x1000 + len(_FD_SIG))
+        if fd_pos == -1:
+            fd_pos = self._find(_FD_SIG)
         
         if fd_pos != -1:
             log.info(f"Flash Descriptor found at 0x{fd_pos:x}")
             
             # Check FLMSTR registers (typically at offset 0x80 in FD)
             if fd_pos + 0x100 < len(self.data):
-                flmstr1 = struct.unpack('<I', self.data[fd_pos+0x80:fd_pos+0x84])[0]
+                flmstr1 = _U32.unpack_from(self.data, fd_pos + 0x80)[0]
                 
                 # Check if write access is locked (heuristic)
                 if flmstr1 & 0x0FFF != 0x0FFF:
@@ -181,6 +240,34 @@ class SecurityAnalyzer:
             log.error("[FAIL] CRITICAL security blocks detected - DO NOT FLASH!")
 
 
+def analyze_file(path: Union[str, Path], quick: bool = False) -> Optional[SecurityStatus]:
+    """Analyze a firmware file in place through a read-only mmap.
+    
+    Every check scans the mapping directly (find, regex and unpack_from
+    all take buffers), so the image is never copied into Python memory
+    and the OS pages in only what the scans touch.
+    
+    Args:
+        path: Path to firmware image
+        quick: Stop at the first hard-fail condition (see analyze)
+    
+    Returns:
+        Security status, or None if the file could not be read
+    """
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return SecurityAnalyzer(b'').analyze(quick)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    # The scans stream front to back; let the kernel read ahead
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                return SecurityAnalyzer(mm).analyze(quick)
+    except OSError as e:
+        log.error(f"Failed to read firmware image: {e}")
+        return None
+
+
 def extract_cpuid_from_microcode(data: bytes, offset: int) -> Optional[int]:
     """Extract CPUID from microcode update header.
     
@@ -199,15 +286,13 @@ def extract_cpuid_from_microcode(data: bytes, offset: int) -> Optional[int]:
         if offset + 0x30 > len(data):
             return None
         
-        header = data[offset:offset+0x30]
-        
         # Check header version (should be 1)
-        hdr_ver = struct.unpack('<I', header[0x00:0x04])[0]
+        hdr_ver = _U32.unpack_from(data, offset)[0]
         if hdr_ver != 1:
             return None
         
         # Extract CPUID (processor signature)
-        cpuid = struct.unpack('<I', header[0x0C:0x10])[0]
+        cpuid = _U32.unpack_from(data, offset + 0x0C)[0]
         
         # Validate it looks like a real CPUID (family 6 for Intel)
         family = (cpuid >> 8) & 0x0F
@@ -221,6 +306,31 @@ def extract_cpuid_from_microcode(data: bytes, offset: int) -> Optional[int]:
         return None
 
 
+def _microcode_candidates(data: bytes) -> Iterator[int]:
+    """Yield 1KB-aligned offsets whose first DWORD is header version 1.
+    
+    Only boundaries more than 0x800 bytes from the end are considered.
+    """
+    limit = max(len(data) - 0x800, 0)
+    
+    if NUMPY_AVAILABLE:
+        # Strided view of the first DWORD at every boundary; one vectorized compare
+        words = np.frombuffer(data, dtype='<u4', count=len(data) // 4)[:(limit + 3) // 4:0x100]
+        yield from (np.flatnonzero(words == 1) * 0x400).tolist()
+        return
+    
+    # Gather the first byte of every boundary with one C-level strided
+    # slice, then let find() skip straight to the 0x01 candidates (a find
+    # over the whole image would read every byte, not one per KB)
+    lead = data[0:limit:0x400]
+    index = lead.find(1)
+    while index != -1:
+        offset = index * 0x400
+        if data[offset + 1:offset + 4] == b'\x00\x00\x00':
+            yield offset
+        index = lead.find(1, index + 1)
+
+
 def find_microcode_updates(data: bytes) -> List[Tuple[int, int]]:
     """Find microcode updates in firmware.
     
@@ -229,23 +339,11 @@ def find_microcode_updates(data: bytes) -> List[Tuple[int, int]]:
     updates = []
     
     # Microcode updates are typically aligned to 1KB
-    for offset in range(0, len(data) - 0x800, 0x400):
-        # Check for microcode header signature (heuristic)
-        if offset + 0x30 > len(data):
-            break
-        
-        # Header version at offset 0
-        try:
-            hdr_ver = struct.unpack('<I', data[offset:offset+4])[0]
-            if hdr_ver != 1:
-                continue
-            
-            # Try to extract CPUID
-            cpuid = extract_cpuid_from_microcode(data, offset)
-            if cpuid:
-                log.info(f"Found microcode update at 0x{offset:x}, CPUID 0x{cpuid:08X}")
-                updates.append((offset, cpuid))
-        except:
-            continue
+    for offset in _microcode_candidates(data):
+        # Try to extract CPUID
+        cpuid = extract_cpuid_from_microcode(data, offset)
+        if cpuid:
+            log.info(f"Found microcode update at 0x{offset:x}, CPUID 0x{cpuid:08X}")
+            updates.append((offset, cpuid))
     
     return updates
@@ -1,45 +1,134 @@
 """Utility functions for compression, checksums, and encoding."""
 
 import struct
+import sys
 import zlib
 import logging
-from typing import Optional
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+# lzma is optional in some Python builds; only the LZMA helpers need it
+try:
+    import lzma
+    LZMA_AVAILABLE = True
+except ImportError:
+    lzma = None
+    LZMA_AVAILABLE = False
+
+# NumPy is optional; it only accelerates bulk sums over large buffers
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
 
 log = logging.getLogger(__name__)
 
+_U16 = struct.Struct('<H')
+_S16 = struct.Struct('<h')
+_GUID_HDR = struct.Struct('<IHH')  # Data1, Data2, Data3 of a GUID
 
-def crc32(data: bytes) -> int:
-    """Calculate CRC32 checksum."""
-    return zlib.crc32(data) & 0xFFFFFFFF
+# Below this size NumPy's per-call overhead outweighs its vectorized sum
+# (RSDP and FV header checksums are 20-72 bytes)
+_NUMPY_MIN_BYTES = 512
+
+# memoryview.cast only offers native byte order
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+# UEFI firmware uses raw LZMA1 in the legacy .lzma container
+_LZMA1_FILTERS = [{"id": lzma.FILTER_LZMA1}] if LZMA_AVAILABLE else None
+
+
+def crc32(data: bytes, init: int = 0) -> int:
+    """Calculate CRC32 checksum.
+    
+    Accepts any buffer (pass memoryview slices to avoid copies); chain
+    regions by passing the previous result as ``init``.
+    """
+    return zlib.crc32(data, init) & 0xFFFFFFFF
+
+
+@lru_cache(maxsize=64)
+def _le_array(count: int, code: str) -> struct.Struct:
+    """Compiled little-endian Struct for ``count`` items of type ``code``."""
+    return struct.Struct(f'<{count}{code}')
 
 
 def checksum8(data: bytes) -> int:
     """Calculate 8-bit checksum."""
+    if NUMPY_AVAILABLE and len(data) >= _NUMPY_MIN_BYTES:
+        return int(np.frombuffer(data, dtype=np.uint8).sum(dtype=np.uint64)) & 0xFF
     return sum(data) & 0xFF
 
 
 def checksum16(data: bytes) -> int:
     """Calculate 16-bit checksum."""
-    total = sum(struct.unpack(f'<{len(data)//2}H', data[:len(data)&~1]))
+    if NUMPY_AVAILABLE and len(data) >= _NUMPY_MIN_BYTES:
+        total = int(np.frombuffer(data, dtype='<u2', count=len(data) // 2).sum(dtype=np.uint64))
+    elif _LITTLE_ENDIAN:
+        # Zero-copy u16 view; the native 'H' format is little-endian here
+        with memoryview(data) as mv:
+            total = sum(mv[:len(mv) & ~1].cast('H'))
+    else:
+        total = sum(_le_array(len(data) // 2, 'H').unpack_from(data))
     return (0x10000 - (total & 0xFFFF)) & 0xFFFF
 
 
+def checksum32(data: bytes) -> int:
+    """Calculate 32-bit sum of little-endian DWORDs (microcode checksum).
+    
+    A valid microcode update sums to 0. Trailing bytes that don't fill a
+    full DWORD are ignored.
+    """
+    dwords = len(data) // 4
+    if NUMPY_AVAILABLE and len(data) >= _NUMPY_MIN_BYTES:
+        total = int(np.frombuffer(data, dtype='<u4', count=dwords).sum(dtype=np.uint64))
+    else:
+        total = sum(_le_array(dwords, 'I').unpack_from(data))
+    return total & 0xFFFFFFFF
+
+
 def try_lzma_decompress(data: bytes) -> Optional[bytes]:
     """Attempt LZMA decompression with error handling."""
+    if not LZMA_AVAILABLE:
+        log.debug("LZMA decompress failed: lzma module not available")
+        return None
     try:
-        import lzma
         return lzma.decompress(data)
     except Exception as e:
         log.debug(f"LZMA decompress failed: {e}")
         return None
 
 
+def try_lzma_decompress_stream(chunks: Iterable[bytes]) -> Optional[bytes]:
+    """Attempt LZMA decompression of one stream delivered in chunks.
+    
+    A single decompressor carries its state across chunks, so the stream
+    never has to be joined into one buffer first.
+    """
+    if not LZMA_AVAILABLE:
+        log.debug("LZMA decompress failed: lzma module not available")
+        return None
+    try:
+        decompressor = lzma.LZMADecompressor()
+        out = [decompressor.decompress(chunk) for chunk in chunks]
+        if not decompressor.eof:
+            log.debug("LZMA decompress failed: stream is truncated")
+            return None
+        return b''.join(out)
+    except Exception as e:
+        log.debug(f"LZMA decompress failed: {e}")
+        return None
+
+
 def try_lzma_compress(data: bytes) -> Optional[bytes]:
     """Attempt LZMA compression with error handling."""
+    if not LZMA_AVAILABLE:
+        log.error("LZMA compress failed: lzma module not available")
+        return None
     try:
-        import lzma
-        return lzma.compress(data, format=lzma.FORMAT_ALONE, 
-                           filters=[{"id": lzma.FILTER_LZMA1}])
+        return lzma.compress(data, format=lzma.FORMAT_ALONE, filters=_LZMA1_FILTERS)
     except Exception as e:
         log.error(f"LZMA compress failed: {e}")
         return None
@@ -54,55 +143,61 @@ def try_zlib_decompress(data: bytes) -> Optional[bytes]:
         return None
 
 
+@lru_cache(maxsize=512)
 def encode_power_limit(watts: int) -> bytes:
     """Encode power limit in watts to firmware format (milliwatts * 8)."""
     mw = watts * 1000
     encoded = mw * 8
-    return struct.pack('<H', encoded & 0xFFFF)
+    return _U16.pack(encoded & 0xFFFF)
 
 
 def decode_power_limit(data: bytes) -> int:
     """Decode power limit from firmware format to watts."""
-    encoded = struct.unpack('<H', data)[0]
+    encoded = _U16.unpack(data)[0]
     mw = encoded // 8
     return mw // 1000
 
 
+@lru_cache(maxsize=512)
 def encode_voltage_offset(mv: int) -> bytes:
     """Encode voltage offset in mV to firmware format (signed, 1/1024V units).
     
     Negative offsets = undervolt.
     Formula: raw = (mV / 1000) * 1024 = mV * 1.024
     """
-    # Convert mV to raw units (1/1024V)
-    raw = int(mv * 1.024)
+    # Convert mV to raw units (1/1024V), truncating toward zero in integers
+    raw = abs(mv) * 1024 // 1000
+    if mv < 0:
+        raw = -raw
     # Pack as signed 16-bit (clamp to valid range)
     raw = max(-32768, min(32767, raw))
-    return struct.pack('<h', raw)
+    return _S16.pack(raw)
 
 
 def decode_voltage_offset(data: bytes) -> int:
     """Decode voltage offset from firmware format to mV."""
-    raw = struct.unpack('<h', data)[0]
-    # Convert from 1/1024V units to mV
-    return int(raw / 1.024)
+    raw = _S16.unpack(data)[0]
+    # Convert from 1/1024V units to mV, truncating toward zero in integers
+    mv = abs(raw) * 1000 // 1024
+    return -mv if raw < 0 else mv
 
 
 def encode_tau(seconds: int) -> bytes:
     """Encode Tau (turbo time window) in seconds to firmware format."""
     # Tau is stored as power-of-2 multiplier and mantissa
     # Simple encoding: store seconds directly for small values
-    return struct.pack('<B', min(seconds, 255))
+    return min(seconds, 255).to_bytes(1, 'little')
 
 
 def hexdump(data: bytes, width: int = 16) -> str:
     """Create hex dump string of binary data."""
-    lines = []
+    # Convert the whole buffer in one C-level pass (each byte takes 3 chars)
+    # and append lines to one growing buffer rather than a list of strings
+    text = memoryview(data).hex(' ').upper().encode('ascii')
+    out = bytearray()
     for i in range(0, len(data), width):
-        chunk = data[i:i+width]
-        hex_str = ' '.join(f'{b:02X}' for b in chunk)
-        lines.append(f"{i:04X}: {hex_str}")
-    return '\n'.join(lines)
+        out += b'%04X: %s\n' % (i, text[i * 3:(i + width) * 3 - 1])
+    return out[:-1].decode('ascii')
 
 
 def align_up(value: int, alignment: int) -> int:
@@ -110,16 +205,32 @@ def align_up(value: int, alignment: int) -> int:
     return (value + alignment - 1) & ~(alignment - 1)
 
 
+def find_all(data: bytes, needle: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[int]:
+    """Yield every (possibly overlapping) offset of needle in data[start:end].
+    
+    Each step is one C-level find(), so callers only pay Python overhead per
+    match rather than per byte. Searching resumes lazily, so writes made to a
+    mutable buffer between matches are seen by later searches.
+    """
+    if end is None:
+        end = len(data)
+    pos = data.find(needle, start, end)
+    while pos >= 0:
+        yield pos
+        pos = data.find(needle, pos + 1, end)
+
+
 def guid_to_str(guid_bytes: bytes) -> str:
     """Convert 16-byte GUID to string format."""
     if len(guid_bytes) != 16:
         return "INVALID-GUID"
     
-    d1, d2, d3 = struct.unpack('<IHH', guid_bytes[:8])
-    d4 = guid_bytes[8:10]
-    d5 = guid_bytes[10:16]
+    # Byte-swap the little-endian Data1-3 fields into display order and
+    # hex the whole GUID in one C-level call instead of five formats
+    g = bytes(guid_bytes)
+    h = (g[3::-1] + g[5:3:-1] + g[7:5:-1] + g[8:]).hex().upper()
     
-    return f"{d1:08X}-{d2:04X}-{d3:04X}-{d4.hex().upper()}-{d5.hex().upper()}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
 
 
 def str_to_guid(guid_str: str) -> bytes:
@@ -128,10 +239,8 @@ def str_to_guid(guid_str: str) -> bytes:
     if len(parts) != 5:
         raise ValueError("Invalid GUID format")
     
-    d1 = struct.pack('<I', int(parts[0], 16))
-    d2 = struct.pack('<H', int(parts[1], 16))
-    d3 = struct.pack('<H', int(parts[2], 16))
+    head = _GUID_HDR.pack(int(parts[0], 16), int(parts[1], 16), int(parts[2], 16))
     d4 = bytes.fromhex(parts[3])
     d5 = bytes.fromhex(parts[4])
     
-    return d1 + d2 + d3 + d4 + d5
+    return head + d4 + d5